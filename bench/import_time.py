@@ -0,0 +1,59 @@
+"""
+Import-Zeit-Budget für den Rechenkern.
+
+    python bench/import_time.py [--budget-ms 50] [--runs 5]
+
+Misst `import perfusor` per `python -X importtime` in frischen Interpretern
+(bester von N Läufen) und prüft, dass dabei keine Drittpakete geladen werden.
+Exit-Code 1 bei Überschreitung des Budgets.
+"""
+
+import argparse
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+FORBIDDEN = ("streamlit", "numpy", "pandas")
+
+
+def import_time_us(module: str) -> int:
+    """Cumulative import time of `module` in microseconds, from -X importtime."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=ROOT, capture_output=True, text=True, check=True,
+    )
+    for line in proc.stderr.splitlines():
+        # "import time: self [us] | cumulative | imported package"
+        parts = [p.strip() for p in line.removeprefix("import time:").split("|")]
+        if len(parts) == 3 and parts[2] == module:
+            return int(parts[1])
+    raise RuntimeError(f"{module} not found in -X importtime output")
+
+
+def loaded_third_party(module: str) -> list[str]:
+    code = f"import sys, {module}; print(' '.join(sys.modules))"
+    proc = subprocess.run([sys.executable, "-c", code], cwd=ROOT, capture_output=True, text=True, check=True)
+    loaded = set(proc.stdout.split())
+    return [m for m in FORBIDDEN if m in loaded]
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--module", default="perfusor")
+    ap.add_argument("--budget-ms", type=float, default=50.0)
+    ap.add_argument("--runs", type=int, default=5)
+    args = ap.parse_args(argv)
+
+    best_ms = min(import_time_us(args.module) for _ in range(args.runs)) / 1000.0
+    leaked = loaded_third_party(args.module)
+    print(f"import {args.module}: {best_ms:.1f} ms (budget {args.budget_ms:.0f} ms)")
+    if leaked:
+        print(f"FAIL: third-party modules imported: {', '.join(leaked)}")
+    if best_ms > args.budget_ms:
+        print("FAIL: import-time budget exceeded")
+    return 1 if leaked or best_ms > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,120 @@
+"""
+Lasttest für die HTTP-API (perfusor.api).
+
+    python -m perfusor.api --server stdlib &
+    python bench/load_test.py --url http://127.0.0.1:8502 --clients 50 --duration 10 --endpoint dose
+
+Jeder Client hält eine keep-alive-Verbindung und sendet Anfragen nacheinander;
+ausgegeben werden Anfragen/s sowie p50/p99-Latenz (bei --endpoint batch zusätzlich Umrechnungen/s).
+"""
+
+import argparse
+import asyncio
+import json
+import random
+import sys
+import time
+from pathlib import Path
+from urllib.parse import urlsplit
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from perfusor import SPECS  # noqa: E402
+
+NAMES = [name for name, spec in SPECS.items() if spec.k is not None]
+
+
+def make_body(endpoint: str, batch_size: int, rng: random.Random) -> bytes:
+    if endpoint == "dose":
+        body = {"drug": rng.choice(NAMES), "rate_ml_h": rng.uniform(0.1, 20), "weight_kg": rng.uniform(40, 150)}
+    elif endpoint == "rate":
+        body = {"drug": rng.choice(NAMES), "dose": rng.uniform(0.01, 10), "weight_kg": rng.uniform(40, 150)}
+    else:
+        body = {
+            "op": "dose",
+            "drug": [rng.choice(NAMES) for _ in range(batch_size)],
+            "value": [rng.uniform(0.1, 20) for _ in range(batch_size)],
+            "weight_kg": [rng.uniform(40, 150) for _ in range(batch_size)],
+        }
+    return json.dumps(body).encode("utf-8")
+
+
+async def client(host, port, endpoint, bodies, deadline, latencies, errors):
+    reader, writer = await asyncio.open_connection(host, port)
+    i = 0
+    try:
+        while time.perf_counter() < deadline:
+            body = bodies[i % len(bodies)]
+            i += 1
+            t0 = time.perf_counter()
+            writer.write(
+                f"POST /{endpoint} HTTP/1.1\r\nHost: {host}\r\nContent-Type: application/json\r\n"
+                f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1") + body
+            )
+            await writer.drain()
+            head = await reader.readuntil(b"\r\n\r\n")
+            length = 0
+            for line in head.split(b"\r\n"):
+                if line.lower().startswith(b"content-length:"):
+                    length = int(line.split(b":", 1)[1])
+            await reader.readexactly(length)
+            latencies.append(time.perf_counter() - t0)
+            if not head.startswith(b"HTTP/1.1 200"):
+                errors.append(head.split(b"\r\n", 1)[0])
+    finally:
+        writer.close()
+
+
+def percentile(sorted_values, q):
+    if not sorted_values:
+        return float("nan")
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+async def run(url, clients, duration, endpoint, batch_size):
+    parts = urlsplit(url)
+    rng = random.Random(0)
+    bodies = [make_body(endpoint, batch_size, rng) for _ in range(64)]
+    latencies, errors = [], []
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    await asyncio.gather(*(
+        client(parts.hostname, parts.port or 80, endpoint, bodies[i:] + bodies[:i], deadline, latencies, errors)
+        for i in range(clients)
+    ))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    result = {
+        "endpoint": endpoint, "clients": clients, "requests": len(latencies), "errors": len(errors),
+        "seconds": elapsed, "requests_per_s": len(latencies) / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000, "p99_ms": percentile(latencies, 0.99) * 1000,
+    }
+    if endpoint == "batch":
+        result["conversions_per_s"] = result["requests_per_s"] * batch_size
+    return result
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--url", default="http://127.0.0.1:8502")
+    ap.add_argument("--clients", type=int, default=50)
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--endpoint", choices=("dose", "rate", "batch"), default="dose")
+    ap.add_argument("--batch-size", type=int, default=1000)
+    ap.add_argument("--json", action="store_true", help="print the result as JSON")
+    args = ap.parse_args(argv)
+
+    r = asyncio.run(run(args.url, args.clients, args.duration, args.endpoint, args.batch_size))
+    if args.json:
+        print(json.dumps(r))
+    else:
+        print(f"{r['endpoint']}: {r['requests']:,} requests in {r['seconds']:.1f} s with {r['clients']} clients "
+              f"({r['errors']} errors)")
+        print(f"  {r['requests_per_s']:,.0f} req/s   p50 {r['p50_ms']:.2f} ms   p99 {r['p99_ms']:.2f} ms")
+        if "conversions_per_s" in r:
+            print(f"  {r['conversions_per_s']:,.0f} conversions/s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
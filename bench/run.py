@@ -0,0 +1,245 @@
+"""
+Benchmark-Suite für Rechenkern, Batch-Umrechnung und kompletten App-Rerun.
+
+    python bench/run.py -o bench/results.json
+    python bench/run.py -o new.json --compare bench/results.json --threshold 0.25
+
+Misst pro dose_unit die Latenz je Aufruf von conc_per_ml / dose_from_rate /
+rate_from_dose, den Durchsatz der Batch-Funktionen, die Suche je Tastendruck,
+die Infusionssimulation, den Alarm-Check, das Totraum-Modell und die Wandzeit
+eines app.py-Reruns über Streamlits AppTest. Mit --compare schlägt der Lauf fehl
+(Exit-Code 1), wenn eine Kennzahl um mehr als --threshold schlechter ist.
+"""
+
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import timeit
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from perfusor import DOSE_UNIT_FACTORS, DRUGS, SPECS, conc_per_ml, dose_from_rate, rate_from_dose  # noqa: E402
+
+
+def _metric(value, unit, better="lower"):
+    return {"value": value, "unit": unit, "better": better}
+
+
+def _per_call_ns(fn, number):
+    """Best of 7 repeats after a warm-up round, in nanoseconds per call."""
+    timeit.timeit(fn, number=number)
+    return min(timeit.repeat(fn, number=number, repeat=7)) / number * 1e9
+
+
+def representative_drugs() -> dict[str, str]:
+    """One catalog entry per dose_unit."""
+    reps = {}
+    for name, drug in DRUGS.items():
+        reps.setdefault(drug["dose_unit"], name)
+    return {du: reps[du] for du in (*DOSE_UNIT_FACTORS, "INFO/BOLUS") if du in reps}
+
+
+def bench_scalar(number: int) -> dict:
+    results = {}
+    for du, name in representative_drugs().items():
+        drug, spec = DRUGS[name], SPECS[name]
+        results[f"conc_per_ml[{du}]"] = _metric(_per_call_ns(lambda: conc_per_ml(drug), number), "ns/call")
+        results[f"dose_from_rate[{du}]"] = _metric(
+            _per_call_ns(lambda: dose_from_rate(2.0, 70.0, spec), number), "ns/call")
+        results[f"rate_from_dose[{du}]"] = _metric(
+            _per_call_ns(lambda: rate_from_dose(0.1, 70.0, spec), number), "ns/call")
+    custom = {"amount": 10, "amount_unit": "mg", "volume_ml": 50, "dose_unit": "µg/kg/min"}
+    results["dose_from_rate[custom dict]"] = _metric(
+        _per_call_ns(lambda: dose_from_rate(2.0, 70.0, custom), number), "ns/call")
+    return results
+
+
+def bench_batch(n: int) -> dict:
+    from perfusor.batch import dose_from_rate_batch, rate_from_dose_batch
+
+    rng = random.Random(0)
+    names = list(SPECS)
+    keys = [rng.choice(names) for _ in range(n)]
+    values = [rng.uniform(0.1, 20) for _ in range(n)]
+    weights = [rng.uniform(40, 150) for _ in range(n)]
+    results = {}
+    for label, fn in (("dose_from_rate_batch", dose_from_rate_batch), ("rate_from_dose_batch", rate_from_dose_batch)):
+        best = min(timeit.repeat(lambda: fn(values, weights, keys), number=1, repeat=5))
+        results[f"{label}[n={n}]"] = _metric(n / best, "conversions/s", better="higher")
+    return results
+
+
+def bench_search() -> dict:
+    """Worst per-keystroke latency (uncached) of typing a few queries, plus index build time."""
+    from perfusor.catalog import DEFAULT
+    from perfusor.search import SearchIndex
+
+    t0 = time.perf_counter()
+    index = SearchIndex(DEFAULT.specs)
+    build = time.perf_counter() - t0
+    prefixes = [q[:i] for q in ("noradrenalin", "propfol", "remi 10", "µg/kg/min dob") for i in range(1, len(q) + 1)]
+    worst = max(_per_call_ns(lambda: index._search(p), 200) for p in prefixes)
+    return {
+        "search_index_build": _metric(build * 1000, "ms"),
+        "search_keystroke_worst": _metric(worst / 1000, "µs/call"),
+    }
+
+
+def bench_simulate() -> dict:
+    """Ward-day (30 titrated pumps, 24 h) exact simulation and one pump's 1-s time series."""
+    from perfusor.simulate import Schedule, simulate_ward
+
+    names = [n for n, s in SPECS.items() if s.k is not None][:30]
+    pumps = [(n, Schedule.titration(1.0, 0.5, 10, increases=6)) for n in names]
+    ward = min(timeit.repeat(lambda: simulate_ward(pumps, 70.0, 24.0), number=5, repeat=5)) / 5
+    sim = simulate_ward(pumps[:1], 70.0, 24.0)[0]
+    series = min(timeit.repeat(lambda: sim.sample(1.0), number=5, repeat=5)) / 5
+    return {
+        "simulate_ward_day[30 pumps]": _metric(ward * 1000, "ms"),
+        "simulate_sample_1s[24 h]": _metric(series * 1000, "ms"),
+    }
+
+
+def bench_delay() -> dict:
+    """One live update of 500 lines (4 pumps each) through the dead-space model."""
+    from perfusor.delay import LineMonitor, ward_delivered
+
+    names = [n for n, s in SPECS.items() if s.k is not None]
+    lines = {}
+    for i in range(500):
+        line = LineMonitor(2.0 + i % 3, 70.0)
+        line.set(0.0, {p: 1.0 + p for p in range(4)}, 10.0,
+                 drugs={p: SPECS[names[(i + p) % len(names)]] for p in range(4)})
+        line.set(60.0, {p: 2.0 + p for p in range(4)}, 10.0)
+        lines[i] = line
+    update = min(timeit.repeat(lambda: ward_delivered(lines, 120.0), number=20, repeat=5)) / 20
+    return {"delay_ward_update[500 lines]": _metric(update * 1000, "ms")}
+
+
+def bench_alarms(n: int) -> dict:
+    """Alarm checks per second: 500 pumps, 5 of them over their limit, per sample and per batch."""
+    from perfusor.alarms import AlarmEngine
+
+    rng = random.Random(0)
+    names = [n for n, s in SPECS.items() if s.max is not None and s.k is not None]
+    engine = AlarmEngine(debounce_s=10.0)
+    pumps = list(range(500))
+    for p in pumps:
+        engine.watch(p, names[p % len(names)], 70.0)
+    ids = [rng.choice(pumps) for _ in range(n)]
+    ts = [i * 0.001 for i in range(n)]
+    rates = [engine.limit(p) * (1.2 if p < 5 else rng.uniform(0.2, 0.95)) for p in ids]
+    samples = list(zip(ids, ts, rates))
+    scalar = min(timeit.repeat(lambda: sum(1 for _ in engine.feed(samples)), number=1, repeat=5))
+    batch = min(timeit.repeat(lambda: engine.check_batch(ids, ts, rates), number=1, repeat=5))
+    return {
+        "alarm_check_samples_per_s": _metric(n / scalar, "samples/s", better="higher"),
+        "alarm_check_batch_samples_per_s": _metric(n / batch, "samples/s", better="higher"),
+    }
+
+
+def bench_app(reruns: int) -> dict:
+    try:
+        from streamlit.testing.v1 import AppTest
+    except ImportError:
+        print("streamlit not installed, skipping app rerun benchmark", file=sys.stderr)
+        return {}
+
+    at = AppTest.from_file(str(ROOT / "app.py"), default_timeout=30)
+    t0 = time.perf_counter()
+    at.run()
+    first = time.perf_counter() - t0
+    if at.exception:
+        raise RuntimeError(f"app.py raised: {at.exception}")
+
+    times = []
+    weight = at.number_input[0]
+    for i in range(reruns):
+        weight.set_value(60.0 + i % 40)
+        t0 = time.perf_counter()
+        at.run()
+        times.append(time.perf_counter() - t0)
+    times.sort()
+    return {
+        "app_first_run": _metric(first * 1000, "ms"),
+        "app_rerun_median": _metric(times[len(times) // 2] * 1000, "ms"),
+    }
+
+
+def _git_commit() -> str | None:
+    try:
+        out = subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True, text=True)
+    except OSError:
+        return None
+    return out.stdout.strip() or None
+
+
+def compare(current: dict, baseline: dict, threshold: float) -> list[str]:
+    """Names of metrics that regressed by more than `threshold` (relative)."""
+    regressions = []
+    for name, new in current["results"].items():
+        old = baseline["results"].get(name)
+        if not old or not old["value"]:
+            continue
+        change = new["value"] / old["value"] - 1.0
+        worse = change if new["better"] == "lower" else -change
+        if worse > threshold:
+            regressions.append(f"{name}: {old['value']:.4g} -> {new['value']:.4g} {new['unit']} ({change:+.0%})")
+    return regressions
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("-o", "--output", help="write results as JSON")
+    ap.add_argument("--compare", help="baseline JSON from an earlier run")
+    ap.add_argument("--threshold", type=float, default=0.25, help="allowed relative slowdown (default 0.25)")
+    ap.add_argument("--number", type=int, default=20_000, help="calls per scalar timing")
+    ap.add_argument("--batch-size", type=int, default=100_000)
+    ap.add_argument("--reruns", type=int, default=20)
+    ap.add_argument("--skip-app", action="store_true")
+    args = ap.parse_args(argv)
+
+    results = {}
+    results.update(bench_scalar(args.number))
+    results.update(bench_batch(args.batch_size))
+    results.update(bench_search())
+    results.update(bench_simulate())
+    results.update(bench_alarms(args.batch_size))
+    results.update(bench_delay())
+    if not args.skip_app:
+        results.update(bench_app(args.reruns))
+
+    report = {
+        "meta": {
+            "commit": _git_commit(),
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "time": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        },
+        "results": results,
+    }
+    for name, m in results.items():
+        print(f"{name:<40} {m['value']:>14,.1f} {m['unit']}")
+    if args.output:
+        Path(args.output).write_text(json.dumps(report, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text(encoding="utf-8"))
+        regressions = compare(report, baseline, args.threshold)
+        if regressions:
+            print(f"\nRegressions vs {args.compare} (threshold {args.threshold:.0%}):")
+            for line in regressions:
+                print(f"  {line}")
+            return 1
+        print(f"\nNo regressions vs {args.compare} (threshold {args.threshold:.0%}).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Durchsatz der HTTP-API in Abhängigkeit von der Zahl der Worker (perfusor.serve).
+
+    python bench/scaling.py --workers 1 2 4 8 --duration 10 -o scaling.json
+
+Startet für jede Worker-Zahl `python -m perfusor.serve` auf einem freien Port und
+erzeugt Last mit mehreren Client-Prozessen (sonst begrenzt der Lastgenerator
+selbst). Ausgegeben werden Anfragen/s, p50/p99 und der Faktor gegenüber dem
+ersten Lauf. Aussagekräftig nur mit mindestens workers + clients CPU-Kernen.
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import re
+import subprocess
+import sys
+import time
+import urllib.request
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT / "bench"))
+
+from load_test import run  # noqa: E402
+
+
+def start_server(workers: int) -> tuple[subprocess.Popen, str]:
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "perfusor.serve", "--workers", str(workers), "--port", "0"],
+        cwd=ROOT, stderr=subprocess.PIPE, text=True,
+    )
+    line = proc.stderr.readline()
+    m = re.search(r"http://\S+:(\d+)", line)
+    if not m:
+        proc.kill()
+        raise RuntimeError(f"server did not start: {line.strip() or proc.stderr.read()}")
+    url = f"http://127.0.0.1:{m.group(1)}"
+    deadline = time.monotonic() + 10
+    while True:
+        try:
+            urllib.request.urlopen(f"{url}/health", timeout=1).read()
+            return proc, url
+        except OSError:
+            if time.monotonic() > deadline:
+                proc.kill()
+                raise
+            time.sleep(0.1)
+
+
+def _load(args):
+    url, clients, duration, endpoint, batch_size = args
+    return asyncio.run(run(url, clients, duration, endpoint, batch_size))
+
+
+def measure(url, processes, clients, duration, endpoint, batch_size) -> dict:
+    per_process = max(1, clients // processes)
+    with multiprocessing.Pool(processes) as pool:
+        parts = pool.map(_load, [(url, per_process, duration, endpoint, batch_size)] * processes)
+    requests = sum(p["requests"] for p in parts)
+    seconds = max(p["seconds"] for p in parts)
+    return {
+        "requests": requests, "errors": sum(p["errors"] for p in parts), "requests_per_s": requests / seconds,
+        # per-process percentiles; the max is a conservative summary
+        "p50_ms": max(p["p50_ms"] for p in parts), "p99_ms": max(p["p99_ms"] for p in parts),
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4])
+    ap.add_argument("--client-processes", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    ap.add_argument("--clients", type=int, default=64, help="connections in total")
+    ap.add_argument("--duration", type=float, default=10.0)
+    ap.add_argument("--endpoint", choices=("dose", "rate", "batch"), default="dose")
+    ap.add_argument("--batch-size", type=int, default=1000)
+    ap.add_argument("-o", "--output", help="write results as JSON")
+    args = ap.parse_args(argv)
+
+    results = []
+    for workers in args.workers:
+        proc, url = start_server(workers)
+        try:
+            r = measure(url, args.client_processes, args.clients, args.duration, args.endpoint, args.batch_size)
+        finally:
+            proc.terminate()
+            proc.wait(10)
+        r["workers"] = workers
+        r["speedup"] = r["requests_per_s"] / results[0]["requests_per_s"] if results else 1.0
+        results.append(r)
+        print(f"{workers:>3} workers: {r['requests_per_s']:>10,.0f} req/s  p50 {r['p50_ms']:.2f} ms  "
+              f"p99 {r['p99_ms']:.2f} ms  ×{r['speedup']:.2f}  ({r['errors']} errors)", flush=True)
+
+    if args.output:
+        report = {"cpus": os.cpu_count(), "endpoint": args.endpoint, "client_processes": args.client_processes,
+                  "clients": args.clients, "duration_s": args.duration, "results": results}
+        Path(args.output).write_text(json.dumps(report, indent=2) + "\n", encoding="utf-8")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,39 @@
+"""
+Perfusor-Rechner 13H3 – reiner Rechenkern.
+
+Importiert nur die Standardbibliothek; Streamlit-UI (app.py) und die
+NumPy-Batch-Umrechnung (perfusor.batch) bauen darauf auf.
+"""
+
+from .core import (
+    CATALOG_VERSION,
+    DOSE_UNIT_FACTORS,
+    SPECS,
+    DrugSpec,
+    amount_to_base,
+    catalog_version,
+    compile_drug,
+    conc_per_ml,
+    dose_from_rate,
+    fmt,
+    rate_from_dose,
+    to_float,
+)
+from .drugs import DRUGS, SUPPORTED_DOSE_UNITS
+
+__all__ = [
+    "CATALOG_VERSION",
+    "DOSE_UNIT_FACTORS",
+    "DRUGS",
+    "SPECS",
+    "SUPPORTED_DOSE_UNITS",
+    "DrugSpec",
+    "amount_to_base",
+    "catalog_version",
+    "compile_drug",
+    "conc_per_ml",
+    "dose_from_rate",
+    "fmt",
+    "rate_from_dose",
+    "to_float",
+]
@@ -0,0 +1,267 @@
+"""
+Dosisgrenzen-Alarm für Pumpen-Telemetrie: Rate (ml/h) über der Maximaldosis laut Blatt.
+
+    python -m perfusor.alarms telemetry.jsonl --debounce 10      # Ereignisse als JSONL auf stdout
+    tail -f telemetry.jsonl | python -m perfusor.alarms - --debounce 10
+
+Pro Pumpe wird die Grenzrate einmal aus rate_from_dose(max) berechnet und im
+Index gehalten; neu berechnet wird nur bei Gewichts-, Medikamenten- oder
+Katalogwechsel. Jede Messung ist dann ein Vergleich `rate > grenze`. Die Grenze
+ist so gewählt, dass der Vergleich genau dann anschlägt, wenn
+dose_from_rate(rate) > max wäre. Ein Alarm wird erst ausgelöst, wenn die Grenze
+`debounce_s` lang überschritten bleibt, und erst aufgehoben, wenn sie
+`clear_s` lang wieder eingehalten ist. Medikamente ohne Maximum (oder
+gewichtsbezogene ohne Gewicht) werden nicht überwacht.
+"""
+
+import argparse
+import json
+import math
+import sys
+import time
+from functools import lru_cache
+
+import numpy as np
+
+from .catalog import current, load_catalog
+from .convert import detect_format, read_rows
+from .core import DrugSpec, dose_from_rate, rate_from_dose, to_float
+
+UNWATCHED = math.inf
+
+
+@lru_cache(maxsize=4096)
+def rate_limit(spec: DrugSpec, weight_kg: float | None) -> float | None:
+    """
+    Largest rate (ml/h) whose dose is still <= spec.max, or None if there is no max or no
+    conversion. Nudged by ulps so `rate > limit` agrees exactly with dose_from_rate.
+    """
+    if spec.max is None or spec.k is None:
+        return None
+    limit = rate_from_dose(float(spec.max), weight_kg, spec)
+    if limit is None:
+        return None
+    while dose_from_rate(limit, weight_kg, spec) > spec.max:
+        limit = math.nextafter(limit, -math.inf)
+    while dose_from_rate(up := math.nextafter(limit, math.inf), weight_kg, spec) <= spec.max:
+        limit = up
+    return limit
+
+
+class AlarmEvent:
+    """Alarm raised ("alarm") or cleared ("clear") for one pump."""
+    __slots__ = ("kind", "pump_id", "drug", "t_s", "rate_ml_h", "limit_ml_h", "dose", "max_dose", "dose_unit")
+
+    def __init__(self, kind, pump_id, drug, t_s, rate_ml_h, limit_ml_h, dose, max_dose, dose_unit):
+        self.kind = kind
+        self.pump_id = pump_id
+        self.drug = drug
+        self.t_s = t_s
+        self.rate_ml_h = rate_ml_h
+        self.limit_ml_h = limit_ml_h
+        self.dose = dose
+        self.max_dose = max_dose
+        self.dose_unit = dose_unit
+
+    def __repr__(self):
+        op = ">" if self.kind == "alarm" else "<="
+        return f"AlarmEvent({self.kind}, {self.pump_id!r}, t={self.t_s}, {self.rate_ml_h} ml/h {op} {self.limit_ml_h})"
+
+    def as_dict(self) -> dict:
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+
+class AlarmEngine:
+    """
+    Threshold index over watched pumps plus debounce state. Pumps get integer slots;
+    per slot the rate limit (inf = unwatched), the time the current violation (or, while
+    alarming, the current compliance) started, and whether an alarm is active.
+    """
+
+    def __init__(self, debounce_s: float = 10.0, clear_s: float = 0.0, catalog=None):
+        self.debounce_s = debounce_s
+        self.clear_s = clear_s
+        self.catalog = catalog or current()
+        self.slots: dict = {}
+        self.pumps: list = []        # (pump_id, spec, weight_kg) per slot
+        self.limits: list[float] = []
+        self.since: list = []        # start of the pending state change, None if none
+        self.active: list[bool] = []
+        self._limit_array = None
+        self.recomputed = 0          # thresholds recomputed so far (for instrumentation)
+
+    def __len__(self):
+        return len(self.pumps)
+
+    def _resolve(self, drug) -> DrugSpec:
+        return drug if isinstance(drug, DrugSpec) else self.catalog.specs[drug]
+
+    def _set_limit(self, slot: int):
+        _, spec, weight = self.pumps[slot]
+        limit = rate_limit(spec, weight if spec.per_kg else None)
+        self.limits[slot] = UNWATCHED if limit is None else limit
+        self._limit_array = None
+        self.recomputed += 1
+
+    def watch(self, pump_id, drug: str | DrugSpec, weight_kg: float | None = None) -> float | None:
+        """Add or update a pump; returns its rate limit (None: not watched)."""
+        spec = self._resolve(drug)
+        slot = self.slots.get(pump_id)
+        if slot is None:
+            slot = self.slots[pump_id] = len(self.pumps)
+            self.pumps.append((pump_id, spec, weight_kg))
+            self.limits.append(UNWATCHED)
+            self.since.append(None)
+            self.active.append(False)
+            self._set_limit(slot)
+        elif self.pumps[slot][1:] != (spec, weight_kg):
+            previous = self.pumps[slot][1]
+            self.pumps[slot] = (pump_id, spec, weight_kg)
+            if previous is not spec or spec.per_kg:
+                self._set_limit(slot)
+            if previous is not spec:  # new syringe: start over
+                self.since[slot], self.active[slot] = None, False
+        limit = self.limits[slot]
+        return None if limit == UNWATCHED else limit
+
+    def set_weight(self, weight_kg: float | None, pump_ids=None):
+        """New patient weight for `pump_ids` (default: all); only weight-based limits change."""
+        for pump_id in self.slots if pump_ids is None else pump_ids:
+            _, spec, _ = self.pumps[self.slots[pump_id]]
+            self.watch(pump_id, spec, weight_kg)
+
+    def set_catalog(self, catalog):
+        """Switch to a reloaded catalog; thresholds are rebuilt only if its version changed."""
+        if catalog.version == self.catalog.version:
+            self.catalog = catalog
+            return
+        self.catalog = catalog
+        for slot, (pump_id, spec, weight) in enumerate(self.pumps):
+            new = catalog.specs.get(spec.name, spec)  # pumps keep drugs dropped from the catalog
+            self.pumps[slot] = (pump_id, new, weight)
+            self._set_limit(slot)
+
+    def limit(self, pump_id) -> float | None:
+        limit = self.limits[self.slots[pump_id]]
+        return None if limit == UNWATCHED else limit
+
+    def _event(self, kind: str, slot: int, t_s: float, rate_ml_h: float) -> AlarmEvent:
+        pump_id, spec, weight = self.pumps[slot]
+        return AlarmEvent(kind, pump_id, spec.name, t_s, rate_ml_h, self.limits[slot],
+                          dose_from_rate(rate_ml_h, weight, spec), spec.max, spec.dose_unit)
+
+    def _step(self, slot: int, t_s: float, rate_ml_h: float, over: bool) -> AlarmEvent | None:
+        # pending change: over while not alarming, or back within the limit while alarming
+        if over != self.active[slot]:
+            since = self.since[slot]
+            if since is None:
+                since = self.since[slot] = t_s
+            if t_s - since >= (self.debounce_s if over else self.clear_s):
+                self.active[slot] = over
+                self.since[slot] = None
+                return self._event("alarm" if over else "clear", slot, t_s, rate_ml_h)
+        else:
+            self.since[slot] = None
+        return None
+
+    def check(self, pump_id, t_s: float, rate_ml_h: float) -> AlarmEvent | None:
+        """Process one sample; returns an event when an alarm is raised or cleared."""
+        slot = self.slots[pump_id]
+        over = rate_ml_h > self.limits[slot]
+        if not over and not self.active[slot] and self.since[slot] is None:
+            return None  # the common case: within the limit, nothing pending
+        return self._step(slot, t_s, rate_ml_h, over)
+
+    def check_batch(self, pump_ids, t_s, rates_ml_h) -> list[AlarmEvent]:
+        """
+        Vectorized check of many samples (in time order). Thresholds are compared with one
+        array operation; only samples of pumps that exceed or have pending/active state are
+        stepped through the debounce logic.
+        """
+        if self._limit_array is None:
+            self._limit_array = np.array(self.limits)
+        slot_of = self.slots
+        slots = np.fromiter((slot_of[p] for p in pump_ids), dtype=np.intp, count=len(pump_ids))
+        rates = np.asarray(rates_ml_h, dtype=float)
+        over = rates > self._limit_array[slots]
+        busy = np.array(self.active) | np.array([s is not None for s in self.since], dtype=bool)
+        busy[slots[over]] = True
+        idx = np.flatnonzero(busy[slots])
+        if not len(idx):
+            return []
+        t_s = np.asarray(t_s, dtype=float)
+        events = []
+        for slot, t, rate, o in zip(slots[idx].tolist(), t_s[idx].tolist(), rates[idx].tolist(),
+                                    over[idx].tolist()):
+            event = self._step(slot, t, rate, o)
+            if event is not None:
+                events.append(event)
+        return events
+
+    def feed(self, samples):
+        """Generator over (pump_id, t_s, rate_ml_h) samples yielding events as they occur."""
+        check = self.check
+        for pump_id, t_s, rate_ml_h in samples:
+            event = check(pump_id, t_s, rate_ml_h)
+            if event is not None:
+                yield event
+
+
+# ---- CLI ----
+def stream_rows(engine: AlarmEngine, rows, pump_col="pump_id", drug_col="drug", rate_col="rate_ml_h",
+                weight_col="weight_kg", time_col="t_s", stats=None):
+    """Telemetry rows -> events; pumps are (re)registered when drug or weight change."""
+    known = {}
+    for row in rows:
+        pump_id, drug = row.get(pump_col), row.get(drug_col)
+        rate, t_s = to_float(row.get(rate_col)), to_float(row.get(time_col))
+        if rate is None or t_s is None or not isinstance(drug, str) or drug not in engine.catalog.specs:
+            if stats is not None:
+                stats["skipped"] += 1
+            continue
+        weight = to_float(row.get(weight_col))
+        if known.get(pump_id) != (drug, weight):
+            known[pump_id] = (drug, weight)
+            engine.watch(pump_id, drug, weight)
+        if stats is not None:
+            stats["samples"] += 1
+        event = engine.check(pump_id, t_s, rate)
+        if event is not None:
+            yield event
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.alarms", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("input", help="CSV/JSONL telemetry, or '-' for stdin")
+    ap.add_argument("--input-format", choices=("csv", "jsonl"))
+    ap.add_argument("--debounce", type=float, default=10.0, help="seconds over the limit before alarming")
+    ap.add_argument("--clear", type=float, default=0.0, help="seconds within the limit before clearing")
+    ap.add_argument("--pump-col", default="pump_id")
+    ap.add_argument("--drug-col", default="drug")
+    ap.add_argument("--rate-col", default="rate_ml_h")
+    ap.add_argument("--weight-col", default="weight_kg")
+    ap.add_argument("--time-col", default="t_s", help="sample time in seconds")
+    ap.add_argument("--catalog", help="JSON/TOML drug catalog (default: $PERFUSOR_CATALOG or built-in)")
+    args = ap.parse_args(argv)
+
+    engine = AlarmEngine(args.debounce, args.clear, load_catalog(args.catalog) if args.catalog else current())
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    stats = {"samples": 0, "skipped": 0}
+    t0 = time.perf_counter()
+    try:
+        rows = read_rows(src, args.input_format or detect_format(args.input, default="jsonl"))
+        for event in stream_rows(engine, rows, args.pump_col, args.drug_col, args.rate_col,
+                                 args.weight_col, args.time_col, stats):
+            print(json.dumps(event.as_dict(), ensure_ascii=False), flush=True)
+    finally:
+        if src is not sys.stdin:
+            src.close()
+    elapsed = time.perf_counter() - t0
+    print(f"{stats['samples']:,} samples, {len(engine)} pumps in {elapsed:.2f} s "
+          f"({stats['samples'] / elapsed if elapsed else 0:,.0f} samples/s), {stats['skipped']:,} skipped",
+          file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,280 @@
+"""
+Headless HTTP/JSON-API für PDMS-Anbindung.
+
+    python -m perfusor.api --port 8502              # uvicorn falls installiert, sonst stdlib
+    python -m perfusor.api --server stdlib
+
+Endpunkte (JSON, Medikament als Katalogname oder Custom-Objekt wie in DRUGS;
+Katalog aus $PERFUSOR_CATALOG mit Hot-Reload, sonst die eingebaute Tabelle):
+    GET  /health
+    GET  /drugs
+    POST /conc   {"drug": ...}
+    POST /dose   {"drug": ..., "rate_ml_h": 2.0, "weight_kg": 70}
+    POST /rate   {"drug": ..., "dose": 0.1, "weight_kg": 70}
+    POST /batch  {"op": "dose"|"rate", "drug": [...], "value": [...], "weight_kg": [...] | 70}
+
+`app` ist eine ASGI-Anwendung; ohne ASGI-Server läuft derselbe Handler auf einem
+asyncio-Server der Standardbibliothek (HTTP/1.1, keep-alive, viele gleichzeitige Clients).
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import math
+import sys
+
+import numpy as np
+
+from .batch import dose_from_rate_batch, rate_from_dose_batch
+from .catalog import CatalogError, current, validate
+from .core import compile_drug, dose_from_rate, rate_from_dose, to_float
+
+MAX_BODY = 16 * 1024 * 1024
+
+logger = logging.getLogger(__name__)
+
+
+class ApiError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+# ---- Handlers ----
+def _spec(drug):
+    if isinstance(drug, str):
+        try:
+            return current().specs[drug]
+        except KeyError:
+            raise ApiError(404, f"Unknown drug: {drug}") from None
+    if isinstance(drug, dict):
+        try:
+            validate({"Custom": drug}, "Custom")
+            return compile_drug(drug, "Custom")
+        except CatalogError as exc:
+            raise ApiError(400, f"Invalid custom drug: {'; '.join(exc.errors)}") from None
+        except (KeyError, TypeError, AttributeError, ValueError) as exc:
+            raise ApiError(400, f"Invalid custom drug: {exc}") from None
+    raise ApiError(400, "'drug' must be a catalog name or an object")
+
+
+def _number(body: dict, key: str, required: bool = True):
+    value = body.get(key)
+    if value is None and not required:
+        return None
+    number = to_float(value)
+    if number is None or not math.isfinite(number):
+        raise ApiError(400, f"'{key}' must be a finite number")
+    return number
+
+
+def _finite(x):
+    # JSON has no NaN/Infinity: overflowing results become null
+    return x if x is None or math.isfinite(x) else None
+
+
+def _drug_info(spec) -> dict:
+    return {
+        "name": spec.name, "dose_unit": spec.dose_unit, "conc": spec.conc, "conc_unit": spec.conc_unit,
+        "start": spec.start, "max": spec.max, "note": spec.note,
+    }
+
+
+def health(body):
+    catalog = current()
+    return {"status": "ok", "catalog": catalog.name, "catalog_version": catalog.version}
+
+
+def drugs(body):
+    catalog = current()
+    return {"catalog": catalog.name, "catalog_version": catalog.version,
+            "drugs": [_drug_info(s) for s in catalog.specs.values()]}
+
+
+def conc(body):
+    spec = _spec(body.get("drug"))
+    return {"conc": _finite(spec.conc), "conc_unit": spec.conc_unit}
+
+
+def dose(body):
+    spec = _spec(body.get("drug"))
+    value = dose_from_rate(_number(body, "rate_ml_h"), _number(body, "weight_kg", required=False), spec)
+    return {"dose": _finite(value), "dose_unit": spec.dose_unit}
+
+
+def rate(body):
+    spec = _spec(body.get("drug"))
+    value = rate_from_dose(_number(body, "dose"), _number(body, "weight_kg", required=False), spec)
+    return {"rate_ml_h": _finite(value)}
+
+
+def batch(body):
+    """Columnar batch over catalog drugs; NaN/inf results (INFO/BOLUS, missing weight, overflow) become null."""
+    op = body.get("op")
+    if op not in ("dose", "rate"):
+        raise ApiError(400, "'op' must be 'dose' or 'rate'")
+    names = body.get("drug")
+    values = body.get("value")
+    if not isinstance(values, list):
+        raise ApiError(400, "'value' must be a list")
+    name_list = names if isinstance(names, list) else [names]
+    if not all(isinstance(n, str) for n in name_list):
+        raise ApiError(400, "'drug' must be a catalog name or a list of names")
+    catalog = current()
+    unknown = sorted({n for n in name_list if n not in catalog.specs})
+    if unknown:
+        raise ApiError(404, f"Unknown drug(s): {', '.join(map(str, unknown[:10]))}")
+    weights = body.get("weight_kg")
+    try:
+        fn = dose_from_rate_batch if op == "dose" else rate_from_dose_batch
+        with np.errstate(over="ignore", invalid="ignore"):
+            result = fn(values, weights, np.asarray(names, dtype=object), catalog.table)
+    except (TypeError, ValueError, OverflowError) as exc:
+        raise ApiError(400, f"Invalid batch input: {exc}") from None
+    result = np.where(np.isfinite(result), result, None).tolist()
+    return {"op": op, "result": result}
+
+
+ROUTES = {
+    ("GET", "/health"): health,
+    ("GET", "/drugs"): drugs,
+    ("POST", "/conc"): conc,
+    ("POST", "/dose"): dose,
+    ("POST", "/rate"): rate,
+    ("POST", "/batch"): batch,
+}
+
+
+def handle(method: str, path: str, body: bytes) -> tuple[int, bytes]:
+    """Route one request; returns (status, JSON body)."""
+    try:
+        handler = ROUTES.get((method, path.split("?", 1)[0]))
+        if handler is None:
+            raise ApiError(404 if method in ("GET", "POST") else 405, f"No route for {method} {path}")
+        try:
+            payload = json.loads(body) if body else {}
+        except ValueError:
+            raise ApiError(400, "Body is not valid JSON") from None
+        if not isinstance(payload, dict):
+            raise ApiError(400, "Body must be a JSON object")
+        status, result = 200, handler(payload)
+    except ApiError as exc:
+        status, result = exc.status, {"error": str(exc)}
+    except Exception:  # a handler bug must not drop the client's (keep-alive) connection
+        logger.exception("unhandled error for %s %s", method, path)
+        status, result = 500, {"error": "Internal error"}
+    try:
+        return status, json.dumps(result, ensure_ascii=False, allow_nan=False).encode("utf-8")
+    except ValueError:
+        return 500, b'{"error": "Result is not representable as JSON"}'
+
+
+# ---- ASGI ----
+async def app(scope, receive, send):
+    if scope["type"] == "lifespan":
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+    body = b""
+    more = True
+    while more:
+        message = await receive()
+        body += message.get("body", b"")
+        more = message.get("more_body", False)
+    status, data = handle(scope["method"], scope["path"], body)
+    await send({
+        "type": "http.response.start", "status": status,
+        "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(data)).encode())],
+    })
+    await send({"type": "http.response.body", "body": data})
+
+
+# ---- stdlib fallback: asyncio HTTP/1.1 server with keep-alive ----
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 413: "Payload Too Large",
+            500: "Internal Server Error"}
+
+
+async def _serve_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+    try:
+        while True:
+            try:
+                head = await reader.readuntil(b"\r\n\r\n")
+            except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                break
+            lines = head.decode("latin-1").split("\r\n")
+            try:
+                method, path, version = lines[0].split(" ", 2)
+            except ValueError:
+                break
+            headers = {}
+            for line in lines[1:]:
+                if ":" in line:
+                    key, value = line.split(":", 1)
+                    headers[key.strip().lower()] = value.strip()
+            try:
+                length = int(headers.get("content-length") or 0)
+            except ValueError:
+                break
+            if length > MAX_BODY:
+                status, data = 413, b'{"error": "Body too large"}'
+                keep_alive = False
+            else:
+                body = await reader.readexactly(length) if length else b""
+                status, data = handle(method, path, body)
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+            writer.write(
+                f"HTTP/1.1 {status} {_REASONS.get(status, '')}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(data)}\r\n"
+                f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n".encode("latin-1") + data
+            )
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def serve_stdlib(host: str = "127.0.0.1", port: int = 8502, sock=None):
+    """Run the stdlib asyncio server until cancelled (pass `sock` to serve an existing socket)."""
+    if sock is not None:
+        server = await asyncio.start_server(_serve_connection, sock=sock, backlog=1024)
+    else:
+        server = await asyncio.start_server(_serve_connection, host, port, backlog=1024)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.api", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8502)
+    ap.add_argument("--server", choices=("auto", "uvicorn", "stdlib"), default="auto")
+    args = ap.parse_args(argv)
+
+    if args.server in ("auto", "uvicorn"):
+        try:
+            import uvicorn
+        except ImportError:
+            if args.server == "uvicorn":
+                raise SystemExit("uvicorn is not installed (pip install uvicorn)")
+        else:
+            uvicorn.run(app, host=args.host, port=args.port, log_level="warning")
+            return 0
+    print(f"Serving on http://{args.host}:{args.port} (stdlib asyncio)", file=sys.stderr)
+    try:
+        asyncio.run(serve_stdlib(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
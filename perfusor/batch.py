@@ -0,0 +1,58 @@
+# =============================================================================
+# Vektorisierte Rate ↔ Dosis-Umrechnung (NumPy) über viele Pumpen gleichzeitig
+# =============================================================================
+
+import numpy as np
+
+from .core import SPECS
+
+# ---- Batch (vectorized) ----
+class SpecTable:
+    """Array-backed view of compiled specs: one row per drug name (k = NaN if inactive)."""
+    __slots__ = ("names", "index", "k", "per_kg")
+
+    def __init__(self, specs):
+        self.names = tuple(specs)
+        self.index = {name: i for i, name in enumerate(self.names)}
+        self.k = np.array([np.nan if s.k is None else s.k for s in specs.values()])
+        self.per_kg = np.array([s.per_kg for s in specs.values()], dtype=bool)
+
+    @classmethod
+    def from_arrays(cls, names, k, per_kg):
+        """Table over existing arrays, e.g. read-only memory maps shared between worker processes."""
+        table = cls.__new__(cls)
+        table.names = tuple(names)
+        table.index = {name: i for i, name in enumerate(table.names)}
+        table.k = k
+        table.per_kg = per_kg
+        return table
+
+    def rows(self, keys):
+        """Map an array of drug names to row indices (KeyError for unknown names)."""
+        keys = np.asarray(keys, dtype=object)
+        uniq, inverse = np.unique(keys, return_inverse=True)
+        return np.array([self.index[key] for key in uniq], dtype=np.intp)[inverse].reshape(keys.shape)
+
+SPEC_TABLE = SpecTable(SPECS)
+
+def _batch_inputs(values, weights_kg, drug_keys, table):
+    # Resolve names before broadcasting so each distinct key array is looked up once
+    values, weights, rows = np.broadcast_arrays(
+        np.asarray(values, dtype=float), np.asarray(weights_kg, dtype=float), table.rows(drug_keys),
+    )
+    k = table.k[rows]
+    per_kg = table.per_kg[rows]
+    # Non-weight-based drugs divide/multiply by exactly 1.0; missing weight -> NaN
+    w = np.where(per_kg, weights, 1.0)
+    w[per_kg & (weights == 0)] = np.nan
+    return values, w, k
+
+def dose_from_rate_batch(rates_ml_h, weights_kg, drug_keys, table: SpecTable = SPEC_TABLE):
+    """Vectorized dose_from_rate over arrays of rates, weights and DRUGS keys (NaN where None)."""
+    rates, w, k = _batch_inputs(rates_ml_h, weights_kg, drug_keys, table)
+    return k * rates / w
+
+def rate_from_dose_batch(targets, weights_kg, drug_keys, table: SpecTable = SPEC_TABLE):
+    """Vectorized rate_from_dose over arrays of target doses, weights and DRUGS keys (NaN where None)."""
+    targets, w, k = _batch_inputs(targets, weights_kg, drug_keys, table)
+    return targets * w / k
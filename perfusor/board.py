@@ -0,0 +1,116 @@
+# =============================================================================
+# Perfusor-Board: mehrere Spritzenpumpen eines Patienten mit inkrementeller Neuberechnung
+# =============================================================================
+
+from .core import SPECS, DrugSpec, dose_from_rate
+
+
+class Pump:
+    """One syringe: drug spec, rate (ml/h) and remaining volume (ml, default: full syringe)."""
+    __slots__ = ("drug", "rate_ml_h", "volume_ml")
+
+    def __init__(self, drug: DrugSpec, rate_ml_h: float, volume_ml: float | None = None):
+        self.drug = drug
+        self.rate_ml_h = rate_ml_h
+        self.volume_ml = drug.volume_ml if volume_ml is None else volume_ml
+
+
+class BoardRow:
+    """Derived values of one pump."""
+    __slots__ = ("name", "dose", "dose_unit", "rate_ml_h", "ml_min", "volume_ml", "hours_to_empty")
+
+    def __init__(self, pump: Pump, weight_kg: float | None):
+        rate = pump.rate_ml_h
+        self.name = pump.drug.name
+        self.dose = dose_from_rate(rate, weight_kg, pump.drug)
+        self.dose_unit = pump.drug.dose_unit
+        self.rate_ml_h = rate
+        self.ml_min = rate / 60.0
+        self.volume_ml = pump.volume_ml
+        self.hours_to_empty = pump.volume_ml / rate if rate and pump.volume_ml is not None else None
+
+
+class Board:
+    """
+    Pumps of one patient. Each change recomputes only the rows it affects:
+    rate/volume/drug changes one row, a weight change only the weight-based rows.
+    """
+
+    def __init__(self, weight_kg: float | None, specs=SPECS):
+        self.weight_kg = weight_kg
+        self.specs = specs
+        self.pumps: list[Pump] = []
+        self.rows: list[BoardRow] = []
+        self.recomputed = 0  # rows recomputed so far (for instrumentation)
+
+    def __len__(self):
+        return len(self.pumps)
+
+    @property
+    def total_ml_h(self) -> float:
+        """Total fluid volume per hour over all pumps."""
+        return sum(p.rate_ml_h for p in self.pumps)
+
+    def _resolve(self, drug) -> DrugSpec:
+        return drug if isinstance(drug, DrugSpec) else self.specs[drug]
+
+    def _recompute(self, i: int):
+        row = BoardRow(self.pumps[i], self.weight_kg)
+        if i < len(self.rows):
+            self.rows[i] = row
+        else:
+            self.rows.append(row)
+        self.recomputed += 1
+
+    def add(self, drug: str | DrugSpec, rate_ml_h: float = 0.0, volume_ml: float | None = None) -> int:
+        self.pumps.append(Pump(self._resolve(drug), rate_ml_h, volume_ml))
+        self._recompute(len(self.pumps) - 1)
+        return len(self.pumps) - 1
+
+    def remove(self, i: int):
+        del self.pumps[i]
+        del self.rows[i]
+
+    def set_rate(self, i: int, rate_ml_h: float):
+        if self.pumps[i].rate_ml_h != rate_ml_h:
+            self.pumps[i].rate_ml_h = rate_ml_h
+            self._recompute(i)
+
+    def set_volume(self, i: int, volume_ml: float | None):
+        if self.pumps[i].volume_ml != volume_ml:
+            self.pumps[i].volume_ml = volume_ml
+            self._recompute(i)
+
+    def set_drug(self, i: int, drug: str | DrugSpec, volume_ml: float | None = None):
+        """Swap the syringe; volume defaults to the new drug's full syringe."""
+        spec = self._resolve(drug)
+        if self.pumps[i].drug is not spec:
+            self.pumps[i] = Pump(spec, self.pumps[i].rate_ml_h, volume_ml)
+            self._recompute(i)
+
+    def set_weight(self, weight_kg: float | None):
+        if weight_kg == self.weight_kg:
+            return
+        self.weight_kg = weight_kg
+        for i, pump in enumerate(self.pumps):
+            if pump.drug.per_kg:
+                self._recompute(i)
+
+    def update(self, pumps: list[tuple]):
+        """
+        Sync with a full list of (drug, rate_ml_h, volume_ml) entries, e.g. from a table editor,
+        touching only rows that differ.
+        """
+        while len(self.pumps) > len(pumps):
+            self.remove(len(self.pumps) - 1)
+        for i, (drug, rate_ml_h, volume_ml) in enumerate(pumps):
+            spec = self._resolve(drug)
+            if i == len(self.pumps):
+                self.add(spec, rate_ml_h, volume_ml)
+                continue
+            pump = self.pumps[i]
+            if volume_ml is None:  # cleared cell: full syringe, as for a new pump
+                volume_ml = spec.volume_ml
+            if (pump.drug, pump.rate_ml_h, pump.volume_ml) != (spec, rate_ml_h, volume_ml):
+                self.pumps[i] = Pump(spec, rate_ml_h, volume_ml)
+                self._recompute(i)
@@ -0,0 +1,391 @@
+"""
+Externe Medikamentenkataloge (JSON/TOML) mit kompiliertem Binär-Cache und Hot-Reload.
+
+    PERFUSOR_CATALOG=stationen/           # Verzeichnis: eine Datei pro Station
+    PERFUSOR_CATALOG=13h3.toml            # oder eine einzelne Datei
+
+    python -m perfusor.catalog export 13h3.json   # eingebaute Tabelle als Vorlage
+    python -m perfusor.catalog check stationen/*.toml
+
+Format wie DRUGS, wahlweise unter einem Schlüssel "drugs":
+    {"drugs": {"Arterenol (Noradrenalin) 10 mg/50 ml": {"amount": 10, "amount_unit": "mg", ...}}}
+    [drugs."Arterenol (Noradrenalin) 10 mg/50 ml"]
+    amount = 10
+    ...
+
+Kataloge werden beim Laden mit perfusor.units geprüft (bekannte Einheiten,
+Dosiseinheit passt zur Mengeneinheit: mg nicht in IE/h; Mengen und Dosen als
+Zahlen, nicht als Text), einmal zu DrugSpecs kompiliert und als Pickle in einem
+privaten Cache-Verzeichnis des Benutzers abgelegt (Schlüssel: Pfad, mtime, Größe;
+Verzeichnisse mit fremdem Besitzer oder Schreibrecht für andere werden nicht
+benutzt). Ein CatalogStore wird von
+allen Sessions geteilt; ändert sich die mtime, lädt ein Hintergrund-Thread neu,
+während Anfragen weiter den bisherigen Katalog bekommen.
+"""
+
+import argparse
+import hashlib
+import json
+import math
+import os
+import pickle
+import stat
+import sys
+import threading
+import time
+import warnings
+from pathlib import Path
+from types import MappingProxyType
+
+from .core import CATALOG_VERSION, SPECS, amount_to_base, catalog_version, compile_drug
+from .drugs import DRUGS
+from .units import UnitError, conversion, parse_dose_unit
+
+CATALOG_SUFFIXES = (".json", ".toml")
+BUILTIN = "13H3 (eingebaut)"
+REQUIRED_FIELDS = ("amount", "amount_unit", "volume_ml", "dose_unit")
+CACHE_FORMAT = 1
+
+
+class CatalogError(ValueError):
+    """Catalog file cannot be parsed or fails validation; `errors` lists all problems."""
+
+    def __init__(self, source, errors: list[str]):
+        self.source = source
+        self.errors = errors
+        super().__init__(f"{source}: " + "; ".join(errors[:10]) + (" …" if len(errors) > 10 else ""))
+
+
+class Catalog:
+    """Immutable compiled catalog; equal (and hashed) by content version."""
+    __slots__ = ("name", "version", "drugs", "specs", "names", "source", "_table")
+
+    def __init__(self, name: str, drugs: dict, specs=None, version: str | None = None, source=None):
+        self.name = name
+        self.version = version or catalog_version(drugs)
+        self.drugs = MappingProxyType({k: MappingProxyType(dict(v)) for k, v in drugs.items()})
+        self.specs = specs if specs is not None else MappingProxyType(
+            {k: compile_drug(v, k) for k, v in drugs.items()})
+        self.names = tuple(self.specs)
+        self.source = source
+        self._table = None
+
+    def __eq__(self, other):
+        return isinstance(other, Catalog) and other.version == self.version
+
+    def __hash__(self):
+        return hash(self.version)
+
+    def __repr__(self):
+        return f"Catalog({self.name!r}, version={self.version!r}, drugs={len(self.names)})"
+
+    def __getstate__(self):
+        return {"name": self.name, "version": self.version, "drugs": {k: dict(v) for k, v in self.drugs.items()},
+                "specs": dict(self.specs), "source": self.source}
+
+    def __setstate__(self, state):
+        self.name = state["name"]
+        self.version = state["version"]
+        self.drugs = MappingProxyType({k: MappingProxyType(v) for k, v in state["drugs"].items()})
+        self.specs = MappingProxyType(state["specs"])
+        self.names = tuple(self.specs)
+        self.source = state["source"]
+        self._table = None
+
+    @property
+    def table(self):
+        """Array-backed SpecTable for the batch engine (built on first use; needs NumPy)."""
+        if self._table is None:
+            if os.environ.get("PERFUSOR_SHARED_DIR"):
+                from .shared import spec_table
+                self._table = spec_table(self)
+            else:
+                from .batch import SpecTable
+                self._table = SpecTable(self.specs)
+        return self._table
+
+
+DEFAULT = Catalog(BUILTIN, DRUGS, specs=SPECS, version=CATALOG_VERSION)
+
+
+# ---- Parsing / validation ----
+def _number(x) -> float | None:
+    # JSON/TOML numbers only: "20" or true would pass float() but break arithmetic later
+    if isinstance(x, bool) or not isinstance(x, (int, float)) or not math.isfinite(x):
+        return None
+    return float(x)
+
+
+def validate(drugs: dict, source="catalog") -> None:
+    """Raise CatalogError listing every invalid entry."""
+    errors = []
+    if not isinstance(drugs, dict) or not drugs:
+        raise CatalogError(source, ["catalog must be a non-empty mapping of drug name -> entry"])
+    for name, drug in drugs.items():
+        if not isinstance(drug, dict):
+            errors.append(f"{name}: entry must be a table/object")
+            continue
+        missing = [f for f in REQUIRED_FIELDS if f not in drug]
+        if missing:
+            errors.append(f"{name}: missing {', '.join(missing)}")
+            continue
+        du, au = drug["dose_unit"], drug["amount_unit"]
+        unit_errors = len(errors)
+        try:
+            amount_to_base(1.0, au)
+        except (ValueError, TypeError):
+            errors.append(f"{name}: unsupported amount_unit {au!r}")
+        if du != "INFO/BOLUS":
+            try:
+                parse_dose_unit(du)
+            except (UnitError, TypeError, AttributeError):
+                errors.append(f"{name}: unsupported dose_unit {du!r} (expected amount[/kg]/time)")
+        if len(errors) == unit_errors and du != "INFO/BOLUS":
+            try:
+                conversion(au, du)
+            except UnitError as exc:
+                errors.append(f"{name}: {exc}")
+        amount, volume = _number(drug["amount"]), _number(drug["volume_ml"])
+        if amount is None or amount < 0:
+            errors.append(f"{name}: amount must be a number >= 0")
+        if volume is None or volume <= 0:
+            errors.append(f"{name}: volume_ml must be a number > 0")
+        if du != "INFO/BOLUS" and amount == 0:
+            errors.append(f"{name}: amount is 0 but dose_unit is {du!r} (use INFO/BOLUS)")
+        for key in ("start", "max"):
+            if drug.get(key) is not None and _number(drug[key]) is None:
+                errors.append(f"{name}: {key} must be a number or empty")
+        if drug.get("note") is not None and not isinstance(drug["note"], str):
+            errors.append(f"{name}: note must be text")
+    if errors:
+        raise CatalogError(source, errors)
+
+
+def parse_file(path) -> dict:
+    """Read a JSON/TOML catalog file into a DRUGS-style dict (not yet validated)."""
+    path = Path(path)
+    try:
+        if path.suffix.lower() == ".toml":
+            import tomllib
+            with open(path, "rb") as f:
+                data = tomllib.load(f)
+        else:
+            with open(path, encoding="utf-8") as f:
+                data = json.load(f)
+    except (OSError, ValueError) as exc:
+        raise CatalogError(path, [str(exc)]) from exc
+    if isinstance(data, dict) and isinstance(data.get("drugs"), dict):
+        data = data["drugs"]
+    return data
+
+
+def _normalize(drugs: dict, source) -> dict:
+    """Validate and fill optional fields; TOML has no null, so absent start/max/note mean None."""
+    validate(drugs, source)
+    return {name: {"start": None, "max": None, "note": None} | drug for name, drug in drugs.items()}
+
+
+def _cache_file(path: Path, cache_dir: Path) -> Path:
+    return cache_dir / (hashlib.sha1(str(path.resolve()).encode("utf-8")).hexdigest()[:16] + ".pickle")
+
+
+def default_cache_dir() -> Path:
+    if os.environ.get("PERFUSOR_CACHE_DIR"):
+        return Path(os.environ["PERFUSOR_CACHE_DIR"])
+    base = os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache"
+    return Path(base) / "perfusor" / "catalog"
+
+
+def _private_dir(cache_dir: Path) -> bool:
+    """Create `cache_dir` (0700) if needed; True only if it is ours and not writable by others."""
+    try:
+        cache_dir.mkdir(mode=0o700, parents=True, exist_ok=True)
+        st = cache_dir.stat()
+    except OSError:
+        return False
+    if not hasattr(os, "getuid"):
+        return True  # Windows: per-user profile directory
+    return st.st_uid == os.getuid() and not st.st_mode & (stat.S_IWGRP | stat.S_IWOTH)
+
+
+def load_catalog(path, cache_dir=None) -> Catalog:
+    """
+    Load and compile one catalog file, using the binary cache when path, mtime and
+    size are unchanged. Raises CatalogError for invalid files.
+    """
+    path = Path(path)
+    st = path.stat()
+    key = (CACHE_FORMAT, str(path.resolve()), st.st_mtime_ns, st.st_size)
+    cache_dir = Path(cache_dir) if cache_dir else default_cache_dir()
+    # unpickling runs code: only read caches nobody else can have written
+    use_cache = _private_dir(cache_dir)
+    cache = _cache_file(path, cache_dir)
+    if use_cache:
+        try:
+            with open(cache, "rb") as f:
+                if hasattr(os, "getuid") and os.fstat(f.fileno()).st_uid != os.getuid():
+                    raise OSError("cache file not owned by us")
+                cached_key, catalog = pickle.load(f)
+            if cached_key == key:
+                return catalog
+        except (OSError, pickle.PickleError, EOFError, ValueError, TypeError, AttributeError):
+            pass
+
+    drugs = _normalize(parse_file(path), path)
+    catalog = Catalog(path.stem, drugs, source=str(path))
+    if not use_cache:
+        return catalog
+    try:
+        tmp = cache.with_suffix(f".{os.getpid()}.tmp")
+        with open(os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600), "wb") as f:
+            pickle.dump((key, catalog), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, cache)
+    except OSError:
+        pass  # cache is an optimisation only
+    return catalog
+
+
+# ---- Hot reload ----
+class CatalogStore:
+    """
+    Current catalog of one file, shared read-only by all sessions.
+    get() never blocks on I/O: at most every `check_interval` seconds it stats the
+    file and, if the mtime changed, reloads in a background thread while callers
+    keep getting the previous catalog. Invalid files keep the old catalog and set
+    `last_error`.
+    """
+
+    def __init__(self, path, check_interval: float = 1.0, cache_dir=None):
+        self.path = Path(path)
+        self.check_interval = check_interval
+        self.cache_dir = cache_dir
+        self.last_error = None
+        self._lock = threading.Lock()
+        self._reloading = False
+        self._mtime = self.path.stat().st_mtime_ns
+        self._catalog = load_catalog(self.path, cache_dir)
+        self._next_check = time.monotonic() + check_interval
+
+    def get(self) -> Catalog:
+        now = time.monotonic()
+        if now >= self._next_check and not self._reloading:
+            self._next_check = now + self.check_interval
+            try:
+                mtime = self.path.stat().st_mtime_ns
+            except OSError as exc:
+                self.last_error = exc
+                return self._catalog
+            if mtime != self._mtime:
+                with self._lock:
+                    if not self._reloading:
+                        self._reloading = True
+                        threading.Thread(target=self._reload, args=(mtime,), daemon=True,
+                                         name=f"catalog-reload-{self.path.name}").start()
+        return self._catalog
+
+    def _reload(self, mtime):
+        try:
+            self._catalog = load_catalog(self.path, self.cache_dir)
+            self.last_error = None
+        except (CatalogError, OSError) as exc:
+            self.last_error = exc
+        finally:
+            self._mtime = mtime
+            self._reloading = False
+
+
+class _FixedStore:
+    def __init__(self, catalog: Catalog):
+        self.path = None
+        self.last_error = None
+        self._catalog = catalog
+
+    def get(self) -> Catalog:
+        return self._catalog
+
+
+def catalog_files(location) -> list[Path]:
+    location = Path(location)
+    if location.is_dir():
+        return sorted(p for p in location.iterdir() if p.suffix.lower() in CATALOG_SUFFIXES)
+    return [location]
+
+
+_stores = None
+_stores_lock = threading.Lock()
+
+
+def stores(location=None) -> dict:
+    """
+    Station name -> store, built once per process: the built-in catalog plus every
+    file from `location` (default: $PERFUSOR_CATALOG, a file or a directory).
+    """
+    global _stores
+    with _stores_lock:
+        if _stores is None or location is not None:
+            location = location or os.environ.get("PERFUSOR_CATALOG")
+            found = {BUILTIN: _FixedStore(DEFAULT)}
+            if location:
+                for path in catalog_files(location):
+                    try:
+                        found[path.stem] = CatalogStore(path)
+                    except (CatalogError, OSError) as exc:
+                        warnings.warn(f"Katalog übersprungen: {exc}", stacklevel=2)
+            _stores = found
+        return _stores
+
+
+def current(station: str | None = None) -> Catalog:
+    """Current catalog of `station` (default: the first external catalog, else the built-in one)."""
+    available = stores()
+    if station is None:
+        station = next((s for s in available if s != BUILTIN), BUILTIN)
+    return available[station].get()
+
+
+# ---- CLI ----
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.catalog", description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    exp = sub.add_parser("export", help="write the built-in DRUGS table as JSON/TOML template")
+    exp.add_argument("output")
+    chk = sub.add_parser("check", help="validate catalog files")
+    chk.add_argument("files", nargs="+")
+    args = ap.parse_args(argv)
+
+    if args.cmd == "export":
+        out = Path(args.output)
+        if out.suffix.lower() == ".toml":
+            out.write_text(_to_toml(DRUGS), encoding="utf-8")
+        else:
+            out.write_text(json.dumps({"drugs": DRUGS}, indent=2, ensure_ascii=False) + "\n", encoding="utf-8")
+        print(f"{len(DRUGS)} entries written to {out}")
+        return 0
+
+    status = 0
+    for f in args.files:
+        try:
+            drugs = _normalize(parse_file(f), f)
+        except CatalogError as exc:
+            status = 1
+            print(f"FAIL {f}")
+            for err in exc.errors:
+                print(f"  {err}")
+        else:
+            print(f"ok   {f}: {len(drugs)} entries, version {catalog_version(drugs)}")
+    return status
+
+
+def _to_toml(drugs: dict) -> str:
+    lines = []
+    for name, drug in drugs.items():
+        lines.append(f"[drugs.{json.dumps(name, ensure_ascii=False)}]")
+        for key, value in drug.items():
+            if value is not None:  # TOML has no null; missing start/max means None
+                lines.append(f"{key} = {json.dumps(value, ensure_ascii=False)}")
+        lines.append("")
+    return "\n".join(lines)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,216 @@
+"""
+Perfusor-Tabellen: Dosis je Gewicht × Rate (bzw. Rate je Gewicht × Dosis) pro Medikament.
+
+    python -m perfusor.charts --out tabellen/ --format html
+
+Alle Tabellen einer Art werden in einem vektorisierten Durchlauf über alle
+nicht-INFO-Einträge berechnet und per LRU-Cache (Katalogversion + Raster) gehalten;
+einzelne Tabellen sind nur Ausschnitte daraus.
+"""
+
+import argparse
+import csv
+import html
+import io
+import os
+import sys
+from functools import lru_cache
+from pathlib import Path
+
+import numpy as np
+
+from .batch import dose_from_rate_batch, rate_from_dose_batch
+from .catalog import Catalog, current
+from .core import fmt
+
+# (start, stop, step) in kg, both ends inclusive
+DEFAULT_WEIGHTS = (40.0, 150.0, 0.5)
+DEFAULT_RATES = (0.5, 1.0, 1.5, 2.0, 3.0, 4.0, 5.0, 6.0, 8.0, 10.0, 12.0, 15.0, 20.0)
+# Default dose columns of rate charts: multiples of the sheet's start dose (capped at max);
+# entries without a start dose get no default columns
+DEFAULT_DOSE_STEPS = (0.25, 0.5, 0.75, 1.0, 1.5, 2.0, 3.0, 4.0)
+
+
+class Chart:
+    """One drug's table; `values[i, j]` belongs to weights[i] and columns[j] (read-only arrays)."""
+    __slots__ = ("name", "kind", "dose_unit", "per_kg", "weights", "columns", "values", "version")
+
+    def __init__(self, name, kind, dose_unit, per_kg, weights, columns, values, version):
+        self.name = name
+        self.kind = kind
+        self.dose_unit = dose_unit
+        self.per_kg = per_kg
+        self.weights = weights
+        self.columns = columns
+        self.values = values
+        self.version = version
+
+    @property
+    def column_label(self) -> str:
+        return "Rate (ml/h)" if self.kind == "dose" else f"Dosis ({self.dose_unit})"
+
+    @property
+    def value_label(self) -> str:
+        return f"Dosis ({self.dose_unit})" if self.kind == "dose" else "Rate (ml/h)"
+
+    def header(self) -> list[str]:
+        return ["Gewicht (kg)"] + [f"{c:g}" for c in self.columns.tolist()]
+
+    def rows(self) -> list[list[str]]:
+        """Formatted table body; non-weight-based drugs have a single row for all weights."""
+        labels = [f"{w:g}" for w in self.weights.tolist()] if self.per_kg else ["alle"]
+        return [[label] + [fmt(None if v != v else v) for v in row]
+                for label, row in zip(labels, self.values.tolist())]
+
+    def to_csv(self) -> str:
+        buf = io.StringIO()
+        writer = csv.writer(buf)
+        writer.writerow([f"{self.name} – {self.value_label}; Spalten: {self.column_label}"])
+        writer.writerow(self.header())
+        writer.writerows(self.rows())
+        return buf.getvalue()
+
+    def to_html(self) -> str:
+        esc = html.escape
+        head = "".join(f"<th>{esc(h)}</th>" for h in self.header())
+        body = "\n".join(
+            "<tr>" + "".join(f"<td>{esc(c)}</td>" for c in row) + "</tr>" for row in self.rows()
+        )
+        return _HTML.format(
+            title=esc(self.name), value_label=esc(self.value_label),
+            column_label=esc(self.column_label), version=esc(self.version), head=head, body=body,
+        )
+
+
+_HTML = """<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8"><title>{title}</title>
+<style>
+body {{ font-family: sans-serif; font-size: 10pt; }}
+table {{ border-collapse: collapse; }}
+th, td {{ border: 1px solid #999; padding: 1px 4px; text-align: right; }}
+thead th {{ background: #eee; position: sticky; top: 0; }}
+tbody tr:nth-child(even) {{ background: #f6f6f6; }}
+@media print {{ thead {{ display: table-header-group; }} tr {{ page-break-inside: avoid; }} }}
+</style></head><body>
+<h2>{title}</h2>
+<p>{value_label}; Spalten: {column_label}. Katalogversion {version}.
+Interne Rechenhilfe – Therapie immer nach Hausstandard &amp; klinischer Situation.</p>
+<table><thead><tr>{head}</tr></thead>
+<tbody>
+{body}
+</tbody></table></body></html>
+"""
+
+
+def weight_grid(weights=DEFAULT_WEIGHTS) -> np.ndarray:
+    start, stop, step = weights
+    return np.round(np.arange(start, stop + step / 2, step), 6)
+
+
+def chart_drugs(catalog: Catalog) -> tuple[str, ...]:
+    """Catalog entries that have a rate/dose conversion (everything except INFO/BOLUS)."""
+    return tuple(name for name, spec in catalog.specs.items() if spec.k is not None)
+
+
+def default_doses(spec) -> tuple[float, ...]:
+    """Dose columns for a rate chart; empty if the entry has no start dose (pass doses explicitly)."""
+    if spec.start is None:
+        return ()
+    doses = [float(f"{spec.start * s:.3g}") for s in DEFAULT_DOSE_STEPS]
+    if spec.max is not None:
+        doses = [d for d in doses if d < spec.max] + [float(spec.max)]
+    return tuple(doses)
+
+
+@lru_cache(maxsize=32)
+def _grid(catalog: Catalog, kind: str, weights: tuple, columns: tuple | None):
+    """
+    All charts of one kind in a single vectorized pass: array (drugs, weights, columns).
+    columns=None means per-drug default dose columns (rate charts only).
+    With $PERFUSOR_SHARED_DIR the arrays are computed once and shared by all workers.
+    """
+    if os.environ.get("PERFUSOR_SHARED_DIR"):
+        from .shared import cached_arrays, key_hash
+        key = f"{catalog.version}/chart-{kind}-{key_hash(weights, columns)}"
+        arrays = cached_arrays(key, lambda: dict(zip(("w", "cols", "values"),
+                                                     _compute_grid(catalog, kind, weights, columns)[1:])))
+        return chart_drugs(catalog), arrays["w"], arrays["cols"], arrays["values"]
+    return _compute_grid(catalog, kind, weights, columns)
+
+
+def _compute_grid(catalog: Catalog, kind: str, weights: tuple, columns: tuple | None):
+    names = chart_drugs(catalog)
+    keys = np.array(names, dtype=object)[:, None, None]
+    w = weight_grid(weights)
+    if kind == "dose":
+        cols = np.broadcast_to(np.asarray(columns, dtype=float), (len(names), len(columns)))
+        values = dose_from_rate_batch(cols[:, None, :], w[None, :, None], keys, catalog.table)
+    else:
+        per_drug = [default_doses(catalog.specs[n]) for n in names] if columns is None else [columns] * len(names)
+        width = max((len(c) for c in per_drug), default=0)
+        cols = np.full((len(names), width), np.nan)
+        for i, c in enumerate(per_drug):
+            cols[i, :len(c)] = c
+        values = rate_from_dose_batch(cols[:, None, :], w[None, :, None], keys, catalog.table)
+    for a in (w, cols, values):
+        a.flags.writeable = False
+    return names, w, cols, values
+
+
+def _chart(catalog, kind, name, weights, columns) -> Chart:
+    names, w, cols, values = _grid(catalog, kind, weights, columns)
+    try:
+        i = names.index(name)
+    except ValueError:
+        raise KeyError(f"No chart for {name!r} (unknown or INFO/BOLUS)") from None
+    spec = catalog.specs[name]
+    width = int(np.count_nonzero(~np.isnan(cols[i])))
+    rows = values[i, :, :width] if spec.per_kg else values[i, :1, :width]
+    return Chart(name, kind, spec.dose_unit, spec.per_kg, w, cols[i, :width], rows, catalog.version)
+
+
+def dose_chart(name: str, weights=DEFAULT_WEIGHTS, rates=DEFAULT_RATES, catalog: Catalog | None = None) -> Chart:
+    """Dose in the drug's dose_unit for every weight × rate (ml/h)."""
+    return _chart(catalog or current(), "dose", name, tuple(weights), tuple(rates))
+
+
+def rate_chart(name: str, weights=DEFAULT_WEIGHTS, doses=None, catalog: Catalog | None = None) -> Chart:
+    """Rate (ml/h) for every weight × dose; default doses derive from the sheet's start/max."""
+    return _chart(catalog or current(), "rate", name, tuple(weights), None if doses is None else tuple(doses))
+
+
+def all_charts(kind: str = "dose", weights=DEFAULT_WEIGHTS, columns=None,
+               catalog: Catalog | None = None) -> dict[str, Chart]:
+    catalog = catalog or current()
+    if kind == "dose":
+        columns = DEFAULT_RATES if columns is None else columns
+    cols = None if columns is None else tuple(columns)
+    return {name: _chart(catalog, kind, name, tuple(weights), cols) for name in chart_drugs(catalog)}
+
+
+def _filename(name: str) -> str:
+    return "".join(c if c.isalnum() or c in "-_." else "_" for c in name).strip("_")
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.charts", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--out", default="tabellen", help="output directory")
+    ap.add_argument("--format", choices=("csv", "html"), default="html")
+    ap.add_argument("--kind", choices=("dose", "rate", "both"), default="both")
+    args = ap.parse_args(argv)
+
+    out = Path(args.out)
+    out.mkdir(parents=True, exist_ok=True)
+    kinds = ("dose", "rate") if args.kind == "both" else (args.kind,)
+    count = 0
+    for kind in kinds:
+        for name, chart in all_charts(kind).items():
+            text = chart.to_html() if args.format == "html" else chart.to_csv()
+            (out / f"{_filename(name)}_{kind}.{args.format}").write_text(text, encoding="utf-8")
+            count += 1
+    print(f"{count} charts written to {out}/")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,248 @@
+"""
+Streaming-Umrechnung von Perfusor-Telemetrie (ml/h → Dosis in der Einheit laut DRUGS).
+
+    python -m perfusor.convert pumps.csv -o doses.csv
+    python -m perfusor.convert pumps.jsonl -o doses.parquet --chunk-size 100000
+
+Liest CSV/JSONL zeilenweise in Blöcken fester Größe (konstanter Speicher, beliebig
+große Dateien), rechnet jeden Block vektorisiert um und hängt die Spalten
+`dose`, `dose_unit` und `status` an. Zeilen mit unbekanntem Medikament bekommen
+status=unknown_drug, unlesbare Zeilen (kein JSON-Objekt, Medikament kein Text)
+status=invalid_row; beide werden am Ende gezählt, der Lauf bricht nicht ab.
+"""
+
+import argparse
+import csv
+import json
+import sys
+import time
+from collections import Counter
+from itertools import islice
+from pathlib import Path
+
+import numpy as np
+
+from .batch import dose_from_rate_batch
+from .catalog import DEFAULT, Catalog, current, load_catalog
+from .core import to_float
+
+FORMATS = ("csv", "jsonl", "parquet")
+OUTPUT_COLUMNS = ("dose", "dose_unit", "status")
+
+
+def detect_format(path: str, default: str = "csv") -> str:
+    suffix = Path(path).suffix.lower()
+    if suffix in (".jsonl", ".ndjson"):
+        return "jsonl"
+    if suffix in (".csv", ".parquet"):
+        return suffix[1:]
+    return default
+
+
+class InvalidRow(dict):
+    """Placeholder for an unreadable input line: {"line": n}; `error` says why."""
+
+    def __init__(self, line: int, error: str):
+        super().__init__(line=line)
+        self.error = error
+
+
+def read_rows(stream, fmt: str):
+    """Yield input rows as dicts, one at a time; unreadable JSONL lines as InvalidRow."""
+    if fmt == "csv":
+        yield from csv.DictReader(stream)
+    elif fmt == "jsonl":
+        for lineno, line in enumerate(stream, 1):
+            if not line.strip():
+                continue
+            try:
+                row = json.loads(line)
+            except ValueError as exc:
+                yield InvalidRow(lineno, f"invalid JSON: {exc}")
+                continue
+            yield row if isinstance(row, dict) else InvalidRow(lineno, "not a JSON object")
+    else:
+        raise ValueError(f"Unsupported input format: {fmt}")
+
+
+def convert_chunk(rows: list[dict], drug_col: str, rate_col: str, weight_col: str,
+                  catalog: Catalog = DEFAULT) -> None:
+    """Add dose/dose_unit/status to each row of the chunk in place."""
+    specs, table = catalog.specs, catalog.table
+    n = len(rows)
+    names = [row.get(drug_col) for row in rows]
+    # None: no drug (unknown); anything but text, e.g. a JSON list, cannot be a catalog name
+    invalid = [isinstance(row, InvalidRow) or not (name is None or isinstance(name, str))
+               for row, name in zip(rows, names)]
+    known = np.fromiter((not bad and name in table.index for name, bad in zip(names, invalid)), dtype=bool, count=n)
+    rates = np.fromiter((_num(row.get(rate_col)) for row in rows), dtype=float, count=n)
+    weights = np.fromiter((_num(row.get(weight_col)) for row in rows), dtype=float, count=n)
+
+    doses = np.full(n, np.nan)
+    if known.any():
+        idx = np.flatnonzero(known)
+        doses[idx] = dose_from_rate_batch(rates[idx], weights[idx], np.array(names, dtype=object)[idx], table)
+
+    for row, name, bad, ok, dose in zip(rows, names, invalid, known.tolist(), doses.tolist()):
+        if bad:
+            row.update(dose=None, dose_unit=None, status="invalid_row")
+        elif not ok:
+            row.update(dose=None, dose_unit=None, status="unknown_drug")
+        elif dose != dose:  # NaN: INFO/BOLUS, missing weight or rate
+            row.update(dose=None, dose_unit=specs[name].dose_unit, status="no_dose")
+        else:
+            row.update(dose=dose, dose_unit=specs[name].dose_unit, status="ok")
+
+
+def _first_valid(rows) -> dict:
+    # output columns come from the first readable row, not from an InvalidRow placeholder
+    return next((row for row in rows if row["status"] != "invalid_row"), rows[0])
+
+
+def _num(x) -> float:
+    v = to_float(x) if x not in (None, "") else None
+    return np.nan if v is None else v
+
+
+class CsvSink:
+    def __init__(self, stream):
+        self.stream = stream
+        self.writer = None
+
+    def write(self, rows):
+        if self.writer is None:
+            fields = [c for c in _first_valid(rows) if c not in OUTPUT_COLUMNS] + list(OUTPUT_COLUMNS)
+            self.writer = csv.DictWriter(self.stream, fieldnames=fields, extrasaction="ignore")
+            self.writer.writeheader()
+        self.writer.writerows(rows)
+
+    def close(self):
+        self.stream.flush()
+
+
+class JsonlSink:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, rows):
+        self.stream.writelines(json.dumps(row, ensure_ascii=False) + "\n" for row in rows)
+
+    def close(self):
+        self.stream.flush()
+
+
+class ParquetSink:
+    """Row groups of one chunk each; input columns are stored as strings."""
+
+    def __init__(self, path):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError as exc:
+            raise SystemExit("Parquet output needs pyarrow (pip install pyarrow)") from exc
+        self.pa, self.pq, self.path = pa, pq, path
+        self.writer = None
+        self.fields = None
+
+    def write(self, rows):
+        pa = self.pa
+        if self.writer is None:
+            self.fields = [c for c in _first_valid(rows) if c not in OUTPUT_COLUMNS]
+            schema = pa.schema([(c, pa.string()) for c in self.fields]
+                               + [("dose", pa.float64()), ("dose_unit", pa.string()), ("status", pa.string())])
+            self.writer = self.pq.ParquetWriter(self.path, schema)
+        columns = {c: [None if row.get(c) is None else str(row.get(c)) for row in rows] for c in self.fields}
+        for c in OUTPUT_COLUMNS:
+            columns[c] = [row[c] for row in rows]
+        self.writer.write_table(pa.table(columns, schema=self.writer.schema))
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def convert(rows, sink, chunk_size: int = 50_000, drug_col: str = "drug",
+            rate_col: str = "rate_ml_h", weight_col: str = "weight_kg", progress=None,
+            catalog: Catalog = DEFAULT) -> dict:
+    """Stream `rows` through the conversion in chunks; return summary statistics."""
+    total = invalid = 0
+    unknown = Counter()
+    t0 = time.perf_counter()
+    rows = iter(rows)
+    while chunk := list(islice(rows, chunk_size)):
+        convert_chunk(chunk, drug_col, rate_col, weight_col, catalog)
+        for row in chunk:
+            if row["status"] == "unknown_drug":
+                unknown[row.get(drug_col)] += 1
+            elif row["status"] == "invalid_row":
+                invalid += 1
+        sink.write(chunk)
+        total += len(chunk)
+        if progress:
+            progress(total, time.perf_counter() - t0)
+    elapsed = time.perf_counter() - t0
+    return {
+        "rows": total,
+        "seconds": elapsed,
+        "rows_per_s": total / elapsed if elapsed > 0 else 0.0,
+        "unknown_rows": sum(unknown.values()),
+        "unknown_drugs": unknown,
+        "invalid_rows": invalid,
+    }
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.convert", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("input", help="CSV/JSONL file, or '-' for stdin")
+    ap.add_argument("-o", "--output", default="-", help="output file, or '-' for stdout (default)")
+    ap.add_argument("--input-format", choices=("csv", "jsonl"))
+    ap.add_argument("--output-format", choices=FORMATS)
+    ap.add_argument("--chunk-size", type=int, default=50_000)
+    ap.add_argument("--drug-col", default="drug")
+    ap.add_argument("--rate-col", default="rate_ml_h")
+    ap.add_argument("--weight-col", default="weight_kg")
+    ap.add_argument("--catalog", help="JSON/TOML drug catalog (default: $PERFUSOR_CATALOG or built-in)")
+    ap.add_argument("-q", "--quiet", action="store_true", help="no progress output on stderr")
+    args = ap.parse_args(argv)
+
+    in_fmt = args.input_format or detect_format(args.input)
+    out_fmt = args.output_format or detect_format(args.output, default=in_fmt)
+    if out_fmt == "parquet" and args.output == "-":
+        ap.error("parquet output needs a file name (-o)")
+
+    src = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    if out_fmt == "parquet":
+        out, sink = None, ParquetSink(args.output)
+    else:
+        out = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+        sink = CsvSink(out) if out_fmt == "csv" else JsonlSink(out)
+
+    def progress(n, elapsed):
+        print(f"\r{n:,} rows, {n / elapsed if elapsed else 0:,.0f} rows/s", end="", file=sys.stderr)
+
+    try:
+        stats = convert(read_rows(src, in_fmt), sink, args.chunk_size,
+                        args.drug_col, args.rate_col, args.weight_col,
+                        progress=None if args.quiet else progress,
+                        catalog=load_catalog(args.catalog) if args.catalog else current())
+    finally:
+        sink.close()
+        for f in (src, out):
+            if f not in (None, sys.stdin, sys.stdout):
+                f.close()
+
+    if not args.quiet:
+        print(file=sys.stderr)
+    print(f"{stats['rows']:,} rows in {stats['seconds']:.2f} s ({stats['rows_per_s']:,.0f} rows/s)",
+          file=sys.stderr)
+    if stats["unknown_rows"]:
+        print(f"{stats['unknown_rows']:,} rows with drug not in the catalog:", file=sys.stderr)
+        for name, count in stats["unknown_drugs"].most_common(20):
+            print(f"  {count:>10,}  {name}", file=sys.stderr)
+    if stats["invalid_rows"]:
+        print(f"{stats['invalid_rows']:,} unreadable rows (status=invalid_row)", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
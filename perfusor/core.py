@@ -0,0 +1,123 @@
+# =============================================================================
+# Rechenkern: Konzentration, Rate ↔ Dosis (ohne Streamlit / Drittpakete)
+# =============================================================================
+
+import zlib
+from types import MappingProxyType
+
+from .drugs import DRUGS, SUPPORTED_DOSE_UNITS
+from .units import amount_scale, conversion, dose_unit_factor
+
+# ---- Helpers ----
+def to_float(x):
+    try:
+        return float(x)
+    except Exception:
+        return None
+
+def amount_to_base(amount: float, unit: str):
+    """
+    Convert amount to base units for concentration:
+    - mass drugs -> micrograms (µg)
+    - mmol drugs -> mmol (kept)
+    - IE drugs -> IE (kept)
+    """
+    num, den, base = amount_scale(unit)
+    return amount * num / den, base
+
+def conc_per_ml(drug: dict):
+    """Return concentration per ml in the matching base unit."""
+    amt = to_float(drug.get("amount"))
+    vol = to_float(drug.get("volume_ml"))
+    u = drug.get("amount_unit")
+
+    if amt is None or vol is None or vol == 0:
+        return 0.0, "—"
+
+    base_amt, base_unit = amount_to_base(amt, u)
+    return base_amt / vol, f"{base_unit}/ml"
+
+# ---- Compiled drug specs ----
+# dose_unit -> (factor from base amount/h to dose_unit, weight-based?), derived by perfusor.units
+DOSE_UNIT_FACTORS = MappingProxyType({
+    du: dose_unit_factor(du) for du in sorted(SUPPORTED_DOSE_UNITS) if du != "INFO/BOLUS"
+})
+
+class DrugSpec:
+    """
+    Immutable, compiled drug entry.
+    k is the linear factor so that dose = k·rate (/weight if per_kg)
+    and rate = dose (·weight) / k; k is None if no rate/dose conversion exists.
+    """
+    __slots__ = (
+        "name", "amount", "amount_unit", "volume_ml", "dose_unit", "start", "max", "note",
+        "conc", "conc_unit", "k", "per_kg",
+    )
+
+    def __init__(self, **fields):
+        for attr in self.__slots__:
+            object.__setattr__(self, attr, fields[attr])
+
+    def __setattr__(self, attr, value):
+        raise AttributeError("DrugSpec is immutable")
+
+    def __repr__(self):
+        return f"DrugSpec({self.name!r}, k={self.k!r}, dose_unit={self.dose_unit!r})"
+
+    def __reduce__(self):
+        return (_spec_from_fields, (tuple(getattr(self, attr) for attr in self.__slots__),))
+
+def _spec_from_fields(values: tuple) -> DrugSpec:
+    return DrugSpec(**dict(zip(DrugSpec.__slots__, values)))
+
+def compile_drug(drug: dict, name: str | None = None) -> DrugSpec:
+    """Parse a DRUGS-style dict once and precompute its conversion factor."""
+    du = drug["dose_unit"]
+    conc, conc_unit = conc_per_ml(drug)
+    # raises UnitError for unknown units or e.g. a mg mixture dosed in IE/h
+    factor, per_kg = (None, False) if du == "INFO/BOLUS" else conversion(drug.get("amount_unit"), du)
+    k = None if (factor is None or conc == 0) else conc * factor
+    return DrugSpec(
+        name=name, amount=drug.get("amount"), amount_unit=drug.get("amount_unit"),
+        volume_ml=drug.get("volume_ml"), dose_unit=du,
+        start=drug.get("start"), max=drug.get("max"), note=drug.get("note"),
+        conc=conc, conc_unit=conc_unit, k=k, per_kg=per_kg,
+    )
+
+def catalog_version(drugs: dict) -> str:
+    """Short content hash of a drug catalog; changes whenever any entry changes."""
+    raw = repr(sorted((name, sorted(drug.items())) for name, drug in drugs.items())).encode("utf-8")
+    return f"{zlib.crc32(raw):08x}"
+
+SPECS = MappingProxyType({name: compile_drug(d, name) for name, d in DRUGS.items()})
+CATALOG_VERSION = catalog_version(DRUGS)
+
+def _spec(drug) -> DrugSpec:
+    return drug if isinstance(drug, DrugSpec) else compile_drug(drug)
+
+def dose_from_rate(rate_ml_h: float, weight_kg: float | None, drug: DrugSpec | dict):
+    """Convert pump rate (ml/h) to dose in the drug's configured dose_unit."""
+    spec = _spec(drug)
+    if spec.k is None:
+        return None
+    if spec.per_kg:
+        return None if not weight_kg else spec.k * rate_ml_h / weight_kg
+    return spec.k * rate_ml_h
+
+def rate_from_dose(target: float, weight_kg: float | None, drug: DrugSpec | dict):
+    """Convert target dose (in drug's dose_unit) to pump rate (ml/h)."""
+    spec = _spec(drug)
+    if target is None or spec.k is None:
+        return None
+    if spec.per_kg:
+        return None if not weight_kg else target * weight_kg / spec.k
+    return target / spec.k
+
+def fmt(x):
+    if x is None:
+        return "—"
+    try:
+        return f"{float(x):.2f}"
+    except Exception:
+        return "—"
+
@@ -0,0 +1,291 @@
+"""
+Verzögerung zwischen Pumpe und Patient: Totraum der Leitung und Trägerlösung.
+
+    python -m perfusor.delay --dead-space 3 --carrier 10 --weight 70 \\
+        --pump "Arterenol (Noradrenalin) 10 mg/50 ml" 0:2,30:4 --hours 2
+
+Alle Spritzen und der Träger münden in eine gemeinsame Leitung mit dem Totraum
+V (ml); sie wird als Pfropfenströmung gerechnet. Mit dem kumulativen
+Gesamtvolumen C(t) (Träger + alle Pumpen) verlässt zur Zeit t die Flüssigkeit
+die Leitung, die zur Zeit τ mit C(τ) = C(t) − V eingetreten ist. Beim Patienten
+kommt dann pro Medikament an:
+
+    Dosis_eff(t) = Dosis(τ) · Q(t) / Q(τ)        (Q = Gesamtfluss in ml/h)
+
+also die eingestellte Dosis von damals, gestaucht oder gedehnt mit der
+Änderung des Gesamtflusses (ein Trägerbolus spült vor). Eine Änderung zur
+Zeit t0 erreicht den Patienten, wenn C(t) = C(t0) + V. Bei stückweise
+konstanten Raten ist das exakt und für beliebig viele Zeitpunkte ein
+np.searchsorted. `delivery()` rechnet ganze Verläufe, `LineMonitor` dasselbe
+inkrementell für Live-Daten (pro Ratenänderung ein Abschnitt, Abschnitte, die
+die Leitung verlassen haben, werden verworfen), `ward_delivered()` alle
+Leitungen einer Station. Ohne `primed` ist die Leitung anfangs nur mit Träger
+gefüllt.
+"""
+
+import argparse
+import csv
+import sys
+from bisect import bisect_right
+
+import numpy as np
+
+from .catalog import current
+from .core import dose_from_rate, fmt
+from .simulate import Schedule, simulate
+
+
+def _outlet(t_s, seg_t, seg_c, seg_q, dead_space_ml):
+    """
+    For times `t_s`: segment index of the fluid leaving the line (−1: initial line content)
+    and the flow ratio Q(t)/Q(τ). Segment i starts at seg_t[i] with cumulative volume seg_c[i].
+    """
+    t_s = np.asarray(t_s, dtype=float)
+    now = np.maximum(np.searchsorted(seg_t, t_s, side="right") - 1, 0)
+    c_now = seg_c[now] + seg_q[now] * (t_s - seg_t[now]) / 3600.0
+    # 'right' skips zero-volume segments (Q = 0): no fluid entered there
+    src = np.searchsorted(seg_c, c_now - dead_space_ml, side="right") - 1
+    q_src = np.where(src >= 0, seg_q[np.maximum(src, 0)], seg_q[0])  # before t=0: first flow
+    with np.errstate(divide="ignore", invalid="ignore"):
+        ratio = np.where(q_src > 0, seg_q[now] / q_src, 0.0)
+    return src, ratio
+
+
+def _arrival(t_change_s, seg_t, seg_c, seg_q, dead_space_ml):
+    """Time at which fluid entering at `t_change_s` leaves the line (inf if the flow stops first)."""
+    t0 = np.asarray(t_change_s, dtype=float)
+    i = np.maximum(np.searchsorted(seg_t, t0, side="right") - 1, 0)
+    target = seg_c[i] + seg_q[i] * (t0 - seg_t[i]) / 3600.0 + dead_space_ml
+    j = np.clip(np.searchsorted(seg_c, target, side="left") - 1, i, len(seg_t) - 1)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        t = np.where(seg_q[j] > 0, seg_t[j] + (target - seg_c[j]) * 3600.0 / seg_q[j], np.inf)
+    return np.maximum(t, t0)
+
+
+class Delivery:
+    """
+    Exact piecewise result on breakpoints `t_s` for one line: rate and set dose per pump and
+    segment (pumps × segments), total flow `flow_ml_h` and cumulative volume `cum_ml`.
+    """
+    __slots__ = ("names", "dose_units", "dead_space_ml", "primed", "t_s", "rate_ml_h", "dose", "flow_ml_h",
+                 "cum_ml", "end_s")
+
+    def __init__(self, names, dose_units, dead_space_ml, primed, t_s, rate_ml_h, dose, flow_ml_h, cum_ml, end_s):
+        self.names = names
+        self.dose_units = dose_units
+        self.dead_space_ml = dead_space_ml
+        self.primed = primed
+        self.t_s = t_s
+        self.rate_ml_h = rate_ml_h
+        self.dose = dose
+        self.flow_ml_h = flow_ml_h
+        self.cum_ml = cum_ml
+        self.end_s = end_s
+
+    def delivered(self, t_s) -> np.ndarray:
+        """Effective dose reaching the patient at `t_s` (pumps × len(t_s)), in each drug's dose_unit."""
+        src, ratio = _outlet(t_s, self.t_s, self.cum_ml, self.flow_ml_h, self.dead_space_ml)
+        initial = self.dose[:, :1] if self.primed else np.zeros((len(self.names), 1))
+        return np.where(src >= 0, self.dose[:, np.maximum(src, 0)], initial) * ratio
+
+    def set_dose(self, t_s) -> np.ndarray:
+        """Dose shown by the pumps (dose_from_rate) at `t_s`, pumps × len(t_s)."""
+        seg = np.maximum(np.searchsorted(self.t_s, np.asarray(t_s, dtype=float), side="right") - 1, 0)
+        return self.dose[:, seg]
+
+    def arrival_s(self, t_change_s) -> np.ndarray:
+        """Time at which a change made at `t_change_s` reaches the patient."""
+        return _arrival(t_change_s, self.t_s, self.cum_ml, self.flow_ml_h, self.dead_space_ml)
+
+    def changes(self) -> list[tuple[str, float, float]]:
+        """(drug, change time, delay until it reaches the patient) for every rate change of every pump."""
+        found = []
+        for name, rates in zip(self.names, self.rate_ml_h):
+            t = self.t_s[1:][np.diff(rates) != 0]
+            found.extend(zip([name] * len(t), t.tolist(), (self.arrival_s(t) - t).tolist()))
+        return sorted(found, key=lambda c: c[1])
+
+    def sample(self, dt_s: float = 1.0) -> dict:
+        """Time series at `dt_s` resolution: t_s, flow_ml_h, and per pump set_dose and delivered (2-D)."""
+        t = np.arange(0.0, self.end_s + dt_s / 2, dt_s)
+        seg = np.maximum(np.searchsorted(self.t_s, t, side="right") - 1, 0)
+        return {"t_s": t, "flow_ml_h": self.flow_ml_h[seg], "set_dose": self.dose[:, seg],
+                "delivered": self.delivered(t)}
+
+
+def _segments(t_s, values, grid):
+    """Piecewise-constant `values` starting at `t_s`, evaluated per segment of `grid`."""
+    return values[np.maximum(np.searchsorted(t_s, grid, side="right") - 1, 0)]
+
+
+def delivery(pumps, dead_space_ml: float, carrier: float | Schedule = 0.0, weight_kg: float | None = None,
+             hours: float = 24.0, primed: bool = True, catalog=None) -> Delivery:
+    """
+    Delivered doses for pumps given as (drug, Schedule) sharing one line with `dead_space_ml`
+    and a carrier (constant ml/h or a rate Schedule).
+    """
+    if dead_space_ml < 0:
+        raise ValueError("dead_space_ml must be >= 0")
+    sims = [simulate(drug, schedule, weight_kg, hours, catalog=catalog) for drug, schedule in pumps]
+    if isinstance(carrier, Schedule):
+        if carrier.kind != "rate":
+            raise ValueError("carrier schedule must be a rate schedule (ml/h)")
+        carrier_t, carrier_q = carrier.times_s, carrier.values
+    else:
+        carrier_t, carrier_q = np.zeros(1), np.array([float(carrier)])
+    end = hours * 3600.0
+    grid = np.unique(np.concatenate([[0.0], carrier_t[carrier_t < end]] + [s.t_s[:-1] for s in sims]))
+    rates = np.array([_segments(s.t_s[:-1], s.rate_ml_h, grid) for s in sims]).reshape(len(sims), len(grid))
+    dose = np.array([_segments(s.t_s[:-1], s.dose, grid) for s in sims]).reshape(len(sims), len(grid))
+    flow = _segments(carrier_t, carrier_q, grid) + rates.sum(axis=0)
+    cum = np.concatenate(([0.0], np.cumsum(flow[:-1] * np.diff(grid) / 3600.0)))
+    return Delivery([s.spec.name for s in sims], [s.spec.dose_unit for s in sims], float(dead_space_ml), primed,
+                    grid, rates, dose, flow, cum, end)
+
+
+# ---- Incremental (live) ----
+class LineMonitor:
+    """
+    One line, updated as rates change: set() appends a segment, delivered() evaluates the
+    outlet. Segments that have completely left the line are dropped, so memory and cost
+    stay proportional to the changes still in the dead space. Weight-based pumps without
+    weight_kg have no dose (None), like dose_from_rate.
+    """
+
+    def __init__(self, dead_space_ml: float, weight_kg: float | None = None, primed: bool = True):
+        self.dead_space_ml = float(dead_space_ml)
+        self.weight_kg = weight_kg
+        self.primed = primed
+        self.pumps: dict = {}           # pump_id -> DrugSpec
+        self.seg_t: list[float] = []
+        self.seg_c: list[float] = []
+        self.seg_q: list[float] = []
+        self.seg_dose: list[dict] = []  # pump_id -> set dose
+        self.initial: dict = {}         # set doses filling the line before the first set() (if primed)
+        self.rates: dict = {}           # pump_id -> current rate_ml_h
+        self.carrier_ml_h = 0.0
+        self.changed_at = None
+
+    def set(self, t_s: float, rates: dict, carrier_ml_h: float | None = None, drugs: dict | None = None):
+        """
+        New rates from `t_s` on: {pump_id: rate_ml_h} for the pumps that changed (others keep
+        their rate, e.g. one pump per live sample); carrier None keeps the carrier flow;
+        `drugs` adds or swaps {pump_id: DrugSpec}.
+        """
+        if drugs:
+            self.pumps.update(drugs)
+        if self.seg_t and t_s < self.seg_t[-1]:
+            raise ValueError("set() times must not go backwards")
+        self.rates = self.rates | rates
+        if carrier_ml_h is not None:
+            self.carrier_ml_h = carrier_ml_h
+        dose = {p: dose_from_rate(r, self.weight_kg, self.pumps[p]) for p, r in self.rates.items()}
+        flow = self.carrier_ml_h + sum(self.rates.values())
+        if not self.seg_t:
+            self.initial = dose if self.primed else {}
+        if self.seg_t and self.seg_t[-1] == t_s:  # several updates at one instant: keep the last
+            self.seg_q[-1], self.seg_dose[-1] = flow, dose
+        else:
+            c = self.seg_c[-1] + self.seg_q[-1] * (t_s - self.seg_t[-1]) / 3600.0 if self.seg_t else 0.0
+            self.seg_t.append(float(t_s))
+            self.seg_c.append(c)
+            self.seg_q.append(flow)
+            self.seg_dose.append(dose)
+        self.changed_at = float(t_s)
+
+    def _prune(self, t_s: float):
+        c_out = self.seg_c[-1] + self.seg_q[-1] * (t_s - self.seg_t[-1]) / 3600.0 - self.dead_space_ml
+        drop = 0
+        while drop + 1 < len(self.seg_c) and self.seg_c[drop + 1] <= c_out:
+            drop += 1
+        if drop:
+            del self.seg_t[:drop], self.seg_c[:drop], self.seg_q[:drop], self.seg_dose[:drop]
+
+    def delivered(self, t_s: float) -> dict:
+        """{pump_id: effective dose at the patient} at `t_s` (non-decreasing, not before the last set())."""
+        if not self.seg_t:
+            return {}
+        self._prune(t_s)
+        # scalar _outlet on the lists (no array round-trip per line and second)
+        seg_t, seg_c, seg_q = self.seg_t, self.seg_c, self.seg_q
+        now = max(bisect_right(seg_t, t_s) - 1, 0)
+        c_now = seg_c[now] + seg_q[now] * (t_s - seg_t[now]) / 3600.0
+        src = bisect_right(seg_c, c_now - self.dead_space_ml) - 1
+        q_src = seg_q[src] if src >= 0 else seg_q[0]
+        ratio = seg_q[now] / q_src if q_src > 0 else 0.0
+        source = self.seg_dose[src] if src >= 0 else self.initial
+        delivered = {}
+        for p in self.pumps:
+            dose = source.get(p, 0.0)  # pump not yet in the line: nothing arrives
+            delivered[p] = None if dose is None else dose * ratio
+        return delivered
+
+    def arrival_s(self, t_change_s: float | None = None) -> float:
+        """When the change at `t_change_s` (default: the last set()) reaches the patient."""
+        t0 = self.changed_at if t_change_s is None else t_change_s
+        return float(_arrival([t0], np.array(self.seg_t), np.array(self.seg_c), np.array(self.seg_q),
+                              self.dead_space_ml)[0])
+
+
+def ward_delivered(monitors: dict, t_s: float) -> dict:
+    """{line: {pump_id: delivered dose}} for all lines of a ward at one instant."""
+    return {line: m.delivered(t_s) for line, m in monitors.items()}
+
+
+# ---- CLI ----
+def _parse_steps(text: str) -> list[tuple[float, float]]:
+    try:
+        return [(float(m), float(v)) for m, v in (part.split(":") for part in text.split(","))]
+    except ValueError:
+        raise argparse.ArgumentTypeError("rates must look like 0:2,30:4 (minutes:ml/h)") from None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.delay", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--pump", nargs=2, action="append", required=True, metavar=("DRUG", "MIN:ML_H,..."),
+                    help="catalog name and rate steps in minutes:ml/h, e.g. 0:2,30:4 (repeatable)")
+    ap.add_argument("--dead-space", type=float, required=True, help="line volume after the junction, ml")
+    ap.add_argument("--carrier", type=float, default=0.0, help="carrier flow in ml/h (default 0)")
+    ap.add_argument("--weight", type=float, help="kg (needed for weight-based dose units)")
+    ap.add_argument("--hours", type=float, default=2.0)
+    ap.add_argument("--empty", action="store_true", help="line initially filled with carrier only")
+    ap.add_argument("--csv", help="write set and delivered doses over time to this file")
+    ap.add_argument("--dt", type=float, default=10.0, help="sample interval for --csv in seconds (default 10)")
+    args = ap.parse_args(argv)
+
+    catalog = current()
+    pumps = []
+    for name, steps in args.pump:
+        spec = catalog.specs.get(name)
+        if spec is None:
+            ap.error(f"unknown drug: {name}")
+        try:
+            steps = _parse_steps(steps)
+        except argparse.ArgumentTypeError as exc:
+            ap.error(str(exc))
+        pumps.append((spec, Schedule.steps([(m / 60.0, v) for m, v in steps], "rate")))
+    try:
+        result = delivery(pumps, args.dead_space, args.carrier, args.weight, args.hours, not args.empty)
+    except ValueError as exc:
+        ap.error(str(exc))
+
+    print(f"Totraum {args.dead_space:g} ml, Träger {args.carrier:g} ml/h")
+    print(f"  Laufzeit durch die Leitung bei Start: {float(result.arrival_s([0.0])[0]) / 60:.1f} min")
+    for name, t, delay in result.changes():
+        print(f"  {t / 60:6.1f} min  {name}: erreicht den Patienten nach {delay / 60:.1f} min")
+    if args.csv:
+        series = result.sample(args.dt)
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(["t_s", "flow_ml_h"]
+                            + [f"{n} ({c})" for n in result.names for c in ("eingestellt", "beim Patienten")])
+            for i, t in enumerate(series["t_s"].tolist()):
+                row = [t, fmt(series["flow_ml_h"][i])]
+                for p in range(len(result.names)):
+                    row += [fmt(series["set_dose"][p, i]), fmt(series["delivered"][p, i])]
+                writer.writerow(row)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
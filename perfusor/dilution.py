@@ -0,0 +1,187 @@
+"""
+Verdünnungsrechner: welche Mischung (Menge/Volumen) passt zu Zieldosisbereich,
+Gewicht und Pumpengrenzen?
+
+    python -m perfusor.dilution "Dobutrex (Dobutamin) 250 mg/50 ml" --weight 70 --dose-max 10
+    python -m perfusor.dilution "Ultiva (Remifentanil) 5 mg/50 ml" --weight 120 --min-rate 0.5
+
+Kandidaten sind alle Katalogkonzentrationen desselben Wirkstoffs plus ein Raster
+eigener Mischungen ("runde" Mengen × Füllvolumina, einige tausend). Für alle
+wird in einem NumPy-Durchlauf die Rate für Start- und Maximaldosis wie in
+rate_from_dose berechnet. Gültig ist, was im Ratenbereich der Pumpe liegt;
+gereiht wird nach Laufzeit der Spritze bei Maximaldosis (bis `target_runtime_h`,
+länger bringt nichts) und danach nach Auflösung (Dosisänderung je Pumpenschritt);
+von eigenen Mischungen gleicher Menge bleibt nur das beste Füllvolumen.
+"""
+
+import argparse
+import sys
+
+import numpy as np
+
+from .catalog import current
+from .core import DrugSpec, amount_to_base, fmt
+from .search import generic_name
+from .units import dose_unit_factor
+
+# "Round" amounts per decade; the grid spans REFERENCE_DECADES around the drug's own amount
+NICE_AMOUNTS = (1.0, 1.2, 1.5, 2.0, 2.5, 3.0, 4.0, 5.0, 6.0, 8.0)
+REFERENCE_DECADES = (-3, 3)
+MIN_FILL_ML = 10.0
+
+
+class Mixture:
+    """One ranked candidate; rates in ml/h, runtimes in h, resolution in dose units per pump step."""
+    __slots__ = ("source", "amount", "amount_unit", "volume_ml", "rate_start", "rate_max",
+                 "runtime_max_h", "runtime_start_h", "resolution", "steps")
+
+    def __init__(self, source, amount, amount_unit, volume_ml, rate_start, rate_max,
+                 runtime_max_h, runtime_start_h, resolution, steps):
+        self.source = source
+        self.amount = amount
+        self.amount_unit = amount_unit
+        self.volume_ml = volume_ml
+        self.rate_start = rate_start
+        self.rate_max = rate_max
+        self.runtime_max_h = runtime_max_h
+        self.runtime_start_h = runtime_start_h
+        self.resolution = resolution
+        self.steps = steps
+
+    @property
+    def label(self) -> str:
+        return self.source or f"Custom {self.amount:g} {self.amount_unit}/{self.volume_ml:g} ml"
+
+    def __repr__(self):
+        return f"Mixture({self.label!r}, {self.rate_start:.2f}–{self.rate_max:.2f} ml/h)"
+
+
+def substance(name: str) -> str:
+    """Grouping key for concentrations of one drug: generic name, else the first word."""
+    return (generic_name(name) or name.split()[0]).casefold()
+
+
+def catalog_candidates(spec: DrugSpec, catalog) -> list[DrugSpec]:
+    """Catalog entries of the same substance that convert in the same dose unit."""
+    if spec.name is None:
+        return [spec]
+    key = substance(spec.name)
+    found = [s for s in catalog.specs.values()
+             if s.k is not None and s.dose_unit == spec.dose_unit and s.name and substance(s.name) == key]
+    return found if spec in found else [spec, *found]
+
+
+def amount_grid(reference: float) -> np.ndarray:
+    """Round amounts from 1/1000 to 1000 × the reference amount."""
+    lo, hi = REFERENCE_DECADES
+    base = np.floor(np.log10(reference))
+    decades = 10.0 ** np.arange(base + lo, base + hi + 1)
+    return np.unique(np.outer(decades, NICE_AMOUNTS).ravel())
+
+
+def solve(drug: DrugSpec | str, weight_kg: float | None = None, dose_min: float | None = None,
+          dose_max: float | None = None, min_rate: float = 0.1, max_rate: float = 99.9, rate_step: float = 0.1,
+          syringe_ml: float = 50.0, target_runtime_h: float = 24.0, amounts=None, volumes=None,
+          limit: int | None = 10, catalog=None) -> list[Mixture]:
+    """
+    Ranked feasible mixtures for dosing `drug` between dose_min and dose_max (default:
+    start and max of the sheet) within the pump's rate range.
+    """
+    catalog = catalog or current()
+    spec = drug if isinstance(drug, DrugSpec) else catalog.specs[drug]
+    if spec.k is None:
+        raise ValueError(f"{spec.name}: no rate/dose conversion (INFO/BOLUS)")
+    if spec.per_kg and not weight_kg:
+        raise ValueError(f"{spec.name}: {spec.dose_unit} needs weight_kg")
+    dose_min = spec.start if dose_min is None else dose_min
+    dose_max = (spec.max if spec.max is not None else dose_min) if dose_max is None else dose_max
+    if dose_min is None or dose_max is None or not 0 < dose_min <= dose_max:
+        raise ValueError("need a dose range 0 < dose_min <= dose_max (the sheet has no start dose)")
+
+    # candidates: catalog concentrations first, then the grid (same amount unit as the drug)
+    listed = catalog_candidates(spec, catalog)
+    grid_amounts = amount_grid(spec.amount) if amounts is None else np.asarray(amounts, dtype=float)
+    grid_volumes = (np.arange(MIN_FILL_ML, syringe_ml + 0.5, 1.0) if volumes is None
+                    else np.asarray(volumes, dtype=float))
+    grid_a, grid_v = (x.ravel() for x in np.meshgrid(grid_amounts, grid_volumes))
+    to_base = np.array([amount_to_base(1.0, s.amount_unit)[0] for s in listed])
+    amount = np.concatenate(([s.amount for s in listed], grid_a))
+    amount_base = np.concatenate(([s.amount for s in listed] * to_base,
+                                  grid_a * amount_to_base(1.0, spec.amount_unit)[0]))
+    volume = np.concatenate(([s.volume_ml for s in listed], grid_v))
+
+    # same arithmetic as compile_drug + rate_from_dose
+    factor = dose_unit_factor(spec.dose_unit)[0]
+    k = amount_base / volume * factor
+    w = weight_kg if spec.per_kg else None
+    rate_start = dose_min * w / k if w else dose_min / k
+    rate_max = dose_max * w / k if w else dose_max / k
+
+    feasible = (rate_start >= min_rate) & (rate_max <= max_rate) & (volume <= syringe_ml)
+    # the grid also contains the catalog mixtures; keep only their catalog rows
+    for i in range(len(listed)):
+        feasible[len(listed):] &= (amount_base[len(listed):] != amount_base[i]) | (volume[len(listed):] != volume[i])
+
+    runtime_max = volume / rate_max
+    runtime_start = volume / rate_start
+    resolution = rate_step * k / w if w else rate_step * k  # dose change per pump step
+    steps = np.floor((rate_max - rate_start) / rate_step + 1e-9)
+    order = np.lexsort((
+        np.arange(len(k)),                              # ties: catalog first, then smaller amount
+        resolution,                                     # finer dosing
+        -np.minimum(runtime_max, target_runtime_h),    # long enough at max dose
+        ~feasible,
+    ))
+    order = order[feasible[order]]
+    # per custom amount only its best fill volume, so the list shows distinct options
+    custom = order >= len(listed)
+    _, first = np.unique(amount[order[custom]], return_index=True)
+    keep = ~custom
+    keep[np.flatnonzero(custom)[first]] = True
+    order = order[keep][:limit]
+    return [
+        Mixture(listed[i].name if i < len(listed) else None, float(amount[i]),
+                listed[i].amount_unit if i < len(listed) else spec.amount_unit, float(volume[i]),
+                float(rate_start[i]), float(rate_max[i]), float(runtime_max[i]), float(runtime_start[i]),
+                float(resolution[i]), int(steps[i]))
+        for i in order.tolist()
+    ]
+
+
+# ---- CLI ----
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.dilution", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("drug", help="catalog name")
+    ap.add_argument("--weight", type=float, help="kg (needed for weight-based dose units)")
+    ap.add_argument("--dose-min", type=float, help="default: start dose of the sheet")
+    ap.add_argument("--dose-max", type=float, help="default: max dose of the sheet (else dose-min)")
+    ap.add_argument("--min-rate", type=float, default=0.1, help="pump minimum in ml/h (default 0.1)")
+    ap.add_argument("--max-rate", type=float, default=99.9, help="pump maximum in ml/h (default 99.9)")
+    ap.add_argument("--step", type=float, default=0.1, help="pump rate step in ml/h (default 0.1)")
+    ap.add_argument("--syringe", type=float, default=50.0, help="syringe volume in ml (default 50)")
+    ap.add_argument("--runtime", type=float, default=24.0, help="runtime that is long enough, h (default 24)")
+    ap.add_argument("-n", type=int, default=10, help="number of results")
+    args = ap.parse_args(argv)
+
+    catalog = current()
+    spec = catalog.specs.get(args.drug)
+    if spec is None:
+        ap.error(f"unknown drug: {args.drug}")
+    try:
+        found = solve(spec, args.weight, args.dose_min, args.dose_max, args.min_rate, args.max_rate, args.step,
+                      args.syringe, args.runtime, limit=args.n, catalog=catalog)
+    except ValueError as exc:
+        ap.error(str(exc))
+    if not found:
+        print("Keine Mischung passt in den Ratenbereich der Pumpe.")
+        return 1
+    print(f"{'Mischung':<45} {'ml/h':>14} {'Laufzeit (h)':>14} {'Dosis/Schritt':>14}")
+    for m in found:
+        rates = f"{fmt(m.rate_start)}–{fmt(m.rate_max)}"
+        runtimes = f"{m.runtime_max_h:.1f}–{m.runtime_start_h:.1f}"
+        print(f"{m.label:<45} {rates:>14} {runtimes:>14} {m.resolution:>14.4g}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,344 @@
+"""
+Live-Raten je Bett: ein Gateway liefert Ratenänderungen der Pumpen, die App
+zeigt die Dosen aller Medikamente des Betts fortlaufend an.
+
+    PERFUSOR_LIVE_FEED=sim streamlit run app.py                 # simuliertes Gateway im Prozess
+    python -m perfusor.live gateway --port 8765                 # simuliertes Gateway über TCP
+    PERFUSOR_LIVE_FEED=tcp://127.0.0.1:8765 streamlit run app.py
+    python -m perfusor.live watch ITS-1 --feed tcp://127.0.0.1:8765
+
+Ein BedHub (einer pro Prozess) hält pro Bett genau eine Verbindung zum Gateway,
+egal wie viele Betrachter das Bett offen haben. Betrachter melden sich per
+Lease an (subscribe bei jedem Refresh) und lesen nur den jeweils letzten
+Schnappschuss; ohne Lease wird die Verbindung nach `idle_s` beendet.
+Eingehende Werte laufen durch eine begrenzte Queue, die nur einmal pro
+`refresh_s` geleert und pro Pumpe zusammengefasst wird; veröffentlicht wird
+also in der Aktualisierungsrate der Oberfläche statt pro Messwert. Kommen mehr
+als QUEUE_SIZE Werte je Refresh, ist die Queue voll: das Lesen vom Gateway
+wartet und TCP drosselt den Sender.
+
+Gateway-Protokoll (TCP, JSON-Zeilen): der Client sendet {"bed": "ITS-1"}, danach
+kommen Zeilen {"pump_id": ..., "drug": ..., "rate_ml_h": ..., "t_s": ..., "weight_kg": ...}.
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import random
+import sys
+import threading
+import time
+import zlib
+
+from .catalog import current
+from .core import fmt
+
+REFRESH_S = 1.0
+IDLE_S = 30.0
+QUEUE_SIZE = 1024
+
+logger = logging.getLogger(__name__)
+
+
+class PumpSample:
+    """One rate reading (or change) of one pump at a bed."""
+    __slots__ = ("pump_id", "drug", "rate_ml_h", "t_s", "weight_kg")
+
+    def __init__(self, pump_id, drug: str, rate_ml_h: float, t_s: float, weight_kg: float | None = None):
+        self.pump_id = pump_id
+        self.drug = drug
+        self.rate_ml_h = rate_ml_h
+        self.t_s = t_s
+        self.weight_kg = weight_kg
+
+    def __repr__(self):
+        return f"PumpSample({self.pump_id!r}, {self.drug!r}, {self.rate_ml_h} ml/h, t={self.t_s})"
+
+    def as_dict(self) -> dict:
+        return {attr: getattr(self, attr) for attr in self.__slots__}
+
+    @classmethod
+    def from_dict(cls, d: dict) -> "PumpSample":
+        return cls(d["pump_id"], d["drug"], float(d["rate_ml_h"]), float(d["t_s"]), d.get("weight_kg"))
+
+
+class BedSnapshot:
+    """Published state of one bed; `version` grows with every publication that changed something."""
+    __slots__ = ("bed", "version", "pumps", "weight_kg", "published_at", "received", "subscribers")
+
+    def __init__(self, bed, version=0, pumps=(), weight_kg=None, published_at=None, received=0, subscribers=0):
+        self.bed = bed
+        self.version = version
+        self.pumps = pumps            # PumpSample per pump, sorted by pump_id
+        self.weight_kg = weight_kg
+        self.published_at = published_at
+        self.received = received      # samples received so far (before coalescing)
+        self.subscribers = subscribers
+
+    def __repr__(self):
+        return f"BedSnapshot({self.bed!r}, v{self.version}, {len(self.pumps)} pumps)"
+
+
+# ---- Feeds ----
+def _bed_seed(bed) -> int:
+    return zlib.crc32(str(bed).encode("utf-8"))
+
+
+async def simulated_feed(bed, pumps: int = 6, interval_s: float = 0.05, burst: int = 5, catalog=None,
+                         seed: int | None = None):
+    """
+    Simulated pump gateway for one bed: a fixed set of drugs (chosen by bed), random
+    rate steps every `interval_s`, now and then a burst of `burst` changes at once.
+    """
+    catalog = catalog or current()
+    rng = random.Random(_bed_seed(bed) if seed is None else seed)
+    names = sorted(n for n, s in catalog.specs.items() if s.k is not None)
+    drugs = rng.sample(names, min(pumps, len(names)))
+    weight = float(rng.randint(50, 110))
+    rates = {i: round(rng.uniform(0.5, 10.0), 1) for i in range(len(drugs))}
+    t0 = time.monotonic()
+    for i, name in enumerate(drugs):
+        yield PumpSample(f"{bed}/{i + 1}", name, rates[i], 0.0, weight)
+    while True:
+        await asyncio.sleep(interval_s)
+        for _ in range(burst if rng.random() < 0.1 else 1):
+            i = rng.randrange(len(drugs))
+            rates[i] = round(max(0.0, rates[i] + rng.choice((-0.2, -0.1, 0.1, 0.2))), 1)
+            yield PumpSample(f"{bed}/{i + 1}", drugs[i], rates[i], time.monotonic() - t0, weight)
+
+
+async def tcp_feed(bed, host: str, port: int):
+    """Samples for `bed` from a JSON-lines gateway (see module docstring)."""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(json.dumps({"bed": bed}).encode("utf-8") + b"\n")
+        await writer.drain()
+        while line := await reader.readline():
+            try:
+                sample = PumpSample.from_dict(json.loads(line))
+            except (KeyError, TypeError, ValueError) as exc:  # one bad line must not end the subscription
+                logger.warning("skipping invalid gateway line for %r: %s (%r)", bed, exc, line[:200])
+                continue
+            yield sample
+    finally:
+        writer.close()
+
+
+def feed_factory(spec: str):
+    """Feed for a PERFUSOR_LIVE_FEED value: "sim" or "tcp://host:port"."""
+    if spec == "sim":
+        return simulated_feed
+    if spec.startswith("tcp://"):
+        host, _, port = spec[len("tcp://"):].rpartition(":")
+        return lambda bed: tcp_feed(bed, host or "127.0.0.1", int(port))
+    raise ValueError(f"PERFUSOR_LIVE_FEED must be 'sim' or 'tcp://host:port', not {spec!r}")
+
+
+# ---- Hub ----
+class _Bed:
+    """Hub-side state of one subscribed bed (touched only on the hub's event loop)."""
+
+    def __init__(self, bed):
+        self.queue = asyncio.Queue(QUEUE_SIZE)
+        self.state: dict = {}           # pump_id -> latest PumpSample, published
+        self.pending: dict = {}         # pump_id -> latest PumpSample, not yet published
+        self.weight_kg = None
+        self.received = 0
+        self.snapshot = BedSnapshot(bed)
+        self.leases: dict = {}          # viewer -> last seen (monotonic)
+        self.tasks: list = []
+
+
+class BedHub:
+    """
+    One shared subscription per bed for all viewers of a process. Runs its own asyncio
+    loop in a daemon thread; viewers call subscribe()/snapshot() from any thread.
+    """
+
+    def __init__(self, feed, refresh_s: float = REFRESH_S, idle_s: float = IDLE_S):
+        self.feed = feed
+        self.refresh_s = refresh_s
+        self.idle_s = idle_s
+        self.beds: dict = {}
+        self.connects = 0               # gateway subscriptions opened so far
+        self._lock = threading.Lock()
+        self._loop = asyncio.new_event_loop()
+        threading.Thread(target=self._loop.run_forever, name="perfusor-live", daemon=True).start()
+        asyncio.run_coroutine_threadsafe(self._reaper(), self._loop)
+
+    def subscribe(self, bed, viewer) -> BedSnapshot:
+        """Renew `viewer`'s lease on `bed` (opening the shared subscription if needed); returns the snapshot."""
+        now = time.monotonic()
+        with self._lock:
+            state = self.beds.get(bed)
+            if state is None:
+                state = self.beds[bed] = _Bed(bed)
+                self.connects += 1
+                self._loop.call_soon_threadsafe(self._start, bed, state)
+            state.leases[viewer] = now
+            return state.snapshot
+
+    def unsubscribe(self, bed, viewer):
+        with self._lock:
+            state = self.beds.get(bed)
+            if state is not None:
+                state.leases.pop(viewer, None)
+
+    def snapshot(self, bed) -> BedSnapshot | None:
+        state = self.beds.get(bed)
+        return None if state is None else state.snapshot
+
+    def close(self):
+        """Cancel all subscriptions and stop the hub's loop (waits up to 5 s)."""
+        asyncio.run_coroutine_threadsafe(self._shutdown(), self._loop).result(5.0)
+        self._loop.call_soon_threadsafe(self._loop.stop)
+
+    # -- on the hub loop --
+    def _start(self, bed, state: _Bed):
+        state.tasks = [self._loop.create_task(self._read(bed, state)),
+                       self._loop.create_task(self._publish(bed, state))]
+
+    def _stop(self, state: _Bed):
+        for task in state.tasks:
+            task.cancel()
+
+    async def _shutdown(self):
+        tasks = [t for t in asyncio.all_tasks(self._loop) if t is not asyncio.current_task()]
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _read(self, bed, state: _Bed):
+        """Gateway -> bounded queue; a full queue suspends reading (backpressure)."""
+        while True:
+            try:
+                async for sample in self.feed(bed):
+                    await state.queue.put(sample)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # gateway gone: retry, viewers keep the last snapshot
+                logger.warning("live feed for %r failed: %s", bed, exc)
+            await asyncio.sleep(self.refresh_s)
+
+    @staticmethod
+    def _coalesce(state: _Bed):
+        """Drain the queue into the latest sample per pump; bursts collapse to one pending value each."""
+        queue = state.queue
+        while not queue.empty():
+            sample = queue.get_nowait()
+            state.pending[sample.pump_id] = sample
+            if sample.weight_kg is not None:
+                state.weight_kg = sample.weight_kg
+            state.received += 1
+
+    async def _publish(self, bed, state: _Bed):
+        """
+        Once per refresh_s: drain the queue and publish the coalesced state; the version only
+        moves on changes. Between refreshes the queue fills up, so its bound throttles the gateway.
+        """
+        while True:
+            self._coalesce(state)
+            old = state.snapshot
+            changed = any((prev := state.state.get(p)) is None
+                          or (prev.drug, prev.rate_ml_h) != (new.drug, new.rate_ml_h)
+                          for p, new in state.pending.items())
+            state.state.update(state.pending)
+            state.pending.clear()
+            if changed or old.weight_kg != state.weight_kg:
+                pumps, version = tuple(state.state[p] for p in sorted(state.state, key=str)), old.version + 1
+            else:
+                pumps, version = old.pumps, old.version
+            state.snapshot = BedSnapshot(bed, version, pumps, state.weight_kg, time.monotonic(), state.received,
+                                         len(state.leases))
+            await asyncio.sleep(self.refresh_s)
+
+    async def _reaper(self):
+        """Close subscriptions whose viewers stopped renewing their lease."""
+        while True:
+            await asyncio.sleep(min(self.idle_s, 5.0))
+            cutoff = time.monotonic() - self.idle_s
+            with self._lock:
+                for bed, state in list(self.beds.items()):
+                    for viewer in [v for v, seen in state.leases.items() if seen < cutoff]:
+                        del state.leases[viewer]
+                    if not state.leases:
+                        del self.beds[bed]
+                        self._stop(state)
+
+
+def live_rows(snapshot: BedSnapshot, weight_kg: float | None, board) -> list[dict]:
+    """Sync `board` (perfusor.board.Board) with the snapshot and return display rows."""
+    pumps = [s for s in snapshot.pumps if s.drug in board.specs]  # drugs unknown to this catalog are skipped
+    board.set_weight(snapshot.weight_kg if snapshot.weight_kg is not None else weight_kg)
+    board.update([(s.drug, s.rate_ml_h, None) for s in pumps])
+    return [
+        {"Pumpe": str(s.pump_id), "Medikament": row.name, "ml/h": fmt(row.rate_ml_h), "Dosis": fmt(row.dose),
+         "Einheit": row.dose_unit}
+        for s, row in zip(pumps, board.rows)
+    ]
+
+
+# ---- CLI ----
+async def serve_gateway(host: str, port: int, interval_s: float):
+    """Simulated gateway over TCP (JSON lines), one simulated_feed per connection."""
+    async def handle(reader, writer):
+        try:
+            bed = json.loads(await reader.readline())["bed"]
+            async for sample in simulated_feed(bed, interval_s=interval_s):
+                writer.write(json.dumps(sample.as_dict(), ensure_ascii=False).encode("utf-8") + b"\n")
+                await writer.drain()  # slow reader: the simulated pumps wait
+        except (ConnectionError, ValueError, KeyError):
+            pass
+        finally:
+            writer.close()
+
+    server = await asyncio.start_server(handle, host, port)
+    print(f"Simulated gateway on {host}:{server.sockets[0].getsockname()[1]}", file=sys.stderr, flush=True)
+    async with server:
+        await server.serve_forever()
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.live", description=__doc__.strip().splitlines()[0])
+    sub = ap.add_subparsers(dest="cmd", required=True)
+    gw = sub.add_parser("gateway", help="run a simulated pump gateway over TCP")
+    gw.add_argument("--host", default="127.0.0.1")
+    gw.add_argument("--port", type=int, default=8765)
+    gw.add_argument("--interval", type=float, default=0.05, help="seconds between rate changes per bed")
+    watch = sub.add_parser("watch", help="print the coalesced snapshots of one bed")
+    watch.add_argument("bed")
+    watch.add_argument("--feed", default="sim", help="'sim' or tcp://host:port (default: sim)")
+    watch.add_argument("--weight", type=float, help="kg if the feed sends none")
+    watch.add_argument("--refresh", type=float, default=REFRESH_S)
+    args = ap.parse_args(argv)
+
+    if args.cmd == "gateway":
+        try:
+            asyncio.run(serve_gateway(args.host, args.port, args.interval))
+        except KeyboardInterrupt:
+            pass
+        return 0
+
+    from .board import Board
+
+    hub = BedHub(feed_factory(args.feed), refresh_s=args.refresh)
+    board = Board(args.weight, current().specs)
+    seen = -1
+    try:
+        while True:
+            snapshot = hub.subscribe(args.bed, "cli")
+            if snapshot.version != seen:
+                seen = snapshot.version
+                print(f"v{snapshot.version}  {snapshot.received} samples  weight {snapshot.weight_kg} kg")
+                for row in live_rows(snapshot, args.weight, board):
+                    print(f"  {row['Pumpe']:<10} {row['Medikament']:<45} {row['ml/h']:>7} ml/h "
+                          f"{row['Dosis']:>9} {row['Einheit']}")
+            time.sleep(args.refresh / 2)
+    except KeyboardInterrupt:
+        hub.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,236 @@
+"""
+Opt-in Laufzeitmetriken (Prometheus-Textformat) für App und Rechenkern.
+
+Aktiviert nur über Umgebungsvariablen; ohne sie sind `instrument()` und
+`timed_rerun()` die Identität und `rerun_start()/rerun_end()` kehren sofort zurück.
+Volle Läufe von app.py zählen als scope="app", Fragment-Reruns unter dem Namen
+des Fragments:
+
+    PERFUSOR_METRICS_PORT=9464        # http://127.0.0.1:9464/metrics
+    PERFUSOR_METRICS_HOST=0.0.0.0     # optional, Standard 127.0.0.1
+    PERFUSOR_METRICS_FILE=metrics.log # je Rerun eine JSON-Zeile, rotierend (10 MB × 5)
+"""
+
+import bisect
+import functools
+import json
+import logging
+import logging.handlers
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+SESSION_TTL_S = 300.0
+CALL_BUCKETS = (1e-6, 2.5e-6, 5e-6, 1e-5, 2.5e-5, 5e-5, 1e-4, 1e-3, 1e-2)
+RERUN_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(names, values) -> str:
+    if not names:
+        return ""
+    return "{" + ",".join(f'{n}="{_escape(v)}"' for n, v in zip(names, values)) + "}"
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: tuple = ()):
+        self.name, self.help, self.label_names = name, help, labels
+        self.values = {}
+        self._lock = threading.Lock()
+
+    def inc(self, *labels, amount: float = 1.0):
+        with self._lock:
+            self.values[labels] = self.values.get(labels, 0.0) + amount
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        with self._lock:
+            lines += [f"{self.name}{_labels(self.label_names, k)} {v}" for k, v in sorted(self.values.items())]
+        return lines
+
+
+class Gauge:
+    def __init__(self, name: str, help: str, fn):
+        self.name, self.help, self.fn = name, help, fn
+
+    def render(self) -> list[str]:
+        return [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} gauge", f"{self.name} {self.fn()}"]
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: tuple, labels: tuple = ()):
+        self.name, self.help, self.buckets, self.label_names = name, help, buckets, labels
+        self.series = {}  # labels -> [bucket counts..., +Inf count, sum]
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels):
+        i = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            s = self.series.get(labels)
+            if s is None:
+                s = self.series[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+            s[i] += 1
+            s[-1] += value
+
+    def render(self) -> list[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series = sorted((k, list(v)) for k, v in self.series.items())
+        for key, s in series:
+            cumulative = 0
+            names = (*self.label_names, "le")
+            for bound, count in zip((*self.buckets, "+Inf"), s[:-1]):
+                cumulative += count
+                lines.append(f"{self.name}_bucket{_labels(names, (*key, bound))} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.label_names, key)} {s[-1]}")
+            lines.append(f"{self.name}_count{_labels(self.label_names, key)} {cumulative}")
+        return lines
+
+
+# ---- Registry ----
+_sessions = {}  # session_id -> last seen (monotonic)
+_sessions_lock = threading.Lock()
+
+
+def active_sessions() -> int:
+    cutoff = time.monotonic() - SESSION_TTL_S
+    with _sessions_lock:
+        for sid in [s for s, seen in _sessions.items() if seen < cutoff]:
+            del _sessions[sid]
+        return len(_sessions)
+
+
+RERUN_SECONDS = Histogram("perfusor_rerun_seconds", "Wall time of an app.py run (scope=app) or a fragment rerun.",
+                          RERUN_BUCKETS, labels=("scope",))
+CALL_SECONDS = Histogram("perfusor_call_seconds", "Time spent per call in calculation helpers.",
+                         CALL_BUCKETS, labels=("function",))
+DRUG_SELECTED = Counter("perfusor_drug_selected_total", "Reruns per selected drug.", labels=("drug",))
+ACTIVE_SESSIONS = Gauge("perfusor_active_sessions", f"Sessions seen in the last {SESSION_TTL_S:.0f} s.",
+                        active_sessions)
+REGISTRY = (RERUN_SECONDS, CALL_SECONDS, DRUG_SELECTED, ACTIVE_SESSIONS)
+
+
+def render() -> str:
+    """All metrics in Prometheus text exposition format."""
+    return "\n".join(line for metric in REGISTRY for line in metric.render()) + "\n"
+
+
+# ---- Setup / exporters ----
+ENABLED = False
+_log = None
+_setup_lock = threading.Lock()
+_setup_done = False
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split("?", 1)[0] != "/metrics":
+            self.send_error(404)
+            return
+        body = render().encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def start_http_server(port: int, host: str = "127.0.0.1") -> ThreadingHTTPServer:
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="perfusor-metrics", daemon=True).start()
+    return server
+
+
+def setup(environ=os.environ) -> bool:
+    """Enable metrics once per process if PERFUSOR_METRICS_PORT/FILE is set; returns ENABLED."""
+    global ENABLED, _log, _setup_done
+    with _setup_lock:
+        if _setup_done:
+            return ENABLED
+        _setup_done = True
+        port = environ.get("PERFUSOR_METRICS_PORT")
+        path = environ.get("PERFUSOR_METRICS_FILE")
+        if not (port or path):
+            return False
+        if port:
+            start_http_server(int(port), environ.get("PERFUSOR_METRICS_HOST", "127.0.0.1"))
+        if path:
+            handler = logging.handlers.RotatingFileHandler(path, maxBytes=10_000_000, backupCount=5,
+                                                           encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+            _log = logging.getLogger("perfusor.metrics")
+            _log.addHandler(handler)
+            _log.setLevel(logging.INFO)
+            _log.propagate = False
+        ENABLED = True
+        return True
+
+
+def instrument(fn, name: str | None = None):
+    """Time every call of `fn` into perfusor_call_seconds; returns `fn` itself when disabled."""
+    if not ENABLED or getattr(fn, "__instrumented__", False):
+        return fn
+    label = name or fn.__name__
+    perf_counter = time.perf_counter
+
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        t0 = perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            CALL_SECONDS.observe(perf_counter() - t0, label)
+
+    timed.__instrumented__ = True
+    return timed
+
+
+def rerun_start():
+    return time.perf_counter() if ENABLED else None
+
+
+def rerun_end(t0, drug: str | None = None, session_id: str | None = None, scope: str = "app"):
+    """Record one app run (or fragment rerun, `scope`) started at `t0` (from rerun_start)."""
+    if t0 is None:
+        return
+    elapsed = time.perf_counter() - t0
+    RERUN_SECONDS.observe(elapsed, scope)
+    if drug is not None:
+        DRUG_SELECTED.inc(drug)
+    if session_id is not None:
+        with _sessions_lock:
+            _sessions[session_id] = time.monotonic()
+    if _log is not None:
+        _log.info(json.dumps({
+            "ts": time.time(), "scope": scope, "rerun_s": elapsed, "drug": drug,
+            "active_sessions": active_sessions(),
+        }, ensure_ascii=False))
+
+
+def timed_rerun(fn=None, *, session_id=None):
+    """
+    Decorator for Streamlit fragments (below @st.fragment): each run is recorded in
+    perfusor_rerun_seconds with scope=<function name>; `session_id` is an optional callable.
+    Returns `fn` itself when disabled.
+    """
+    if fn is None:
+        return functools.partial(timed_rerun, session_id=session_id)
+    if not ENABLED:
+        return fn
+
+    @functools.wraps(fn)
+    def timed(*args, **kwargs):
+        t0 = time.perf_counter()
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            rerun_end(t0, session_id=session_id() if session_id else None, scope=fn.__name__)
+
+    return timed
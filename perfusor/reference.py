@@ -0,0 +1,143 @@
+# =============================================================================
+# Referenz-Umrechnung: Einheiten ausgeschrieben, unabhängig vom Rechenkern
+# =============================================================================
+#
+# Bewusst unabhängig von perfusor.units / DrugSpec.k: Mengen-, Zeit- und
+# Gewichtsanteil der dose_unit werden mit eigenen, ausgeschriebenen Zweigen
+# umgerechnet (Stand vor dem Rechenkern, ergänzt um alle Einheiten, die
+# perfusor.units annimmt). Nur für perfusor.verify – langsam, aber einfach
+# nachzuprüfen. Unbekannte Einheiten lösen ValueError aus statt None.
+
+from .core import to_float
+
+
+def amount_to_base(amount: float, unit: str):
+    """Amount in µg (mass), mmol (substance) or IE."""
+    if unit in ("IE", "IU", "I.E."):
+        return amount, "IE"
+
+    # substance -> mmol
+    if unit == "mol":
+        return amount * 1_000.0, "mmol"
+    if unit == "mmol":
+        return amount, "mmol"
+    if unit in ("µmol", "μmol", "umol"):
+        return amount / 1_000.0, "mmol"
+
+    # mass -> µg
+    if unit == "g":
+        return amount * 1_000_000.0, "µg"
+    if unit == "mg":
+        return amount * 1_000.0, "µg"
+    if unit in ("µg", "μg", "ug", "mcg"):
+        return amount * 1.0, "µg"
+    if unit == "ng":
+        return amount / 1_000.0, "µg"
+
+    raise ValueError(f"Unsupported amount_unit: {unit}")
+
+
+def conc_per_ml(drug: dict):
+    """Return concentration per ml in the matching base unit."""
+    amt = to_float(drug.get("amount"))
+    vol = to_float(drug.get("volume_ml"))
+    u = drug.get("amount_unit")
+
+    if amt is None or vol is None or vol == 0:
+        return 0.0, "—"
+
+    base_amt, base_unit = amount_to_base(amt, u)
+    return base_amt / vol, base_unit
+
+
+def split_dose_unit(du: str):
+    """"<amount>[/kg]/<time>" -> (amount unit, per kg?, time unit)."""
+    parts = [p.strip() for p in du.split("/")]
+    if len(parts) == 3 and parts[1] == "kg":
+        return parts[0], True, parts[2]
+    if len(parts) == 2:
+        return parts[0], False, parts[1]
+    raise ValueError(f"Unsupported dose_unit: {du}")
+
+
+def _check_dimension(amount_unit: str, conc_unit: str, du: str):
+    # amount_to_base(1, unit) tells the dimension of the dose amount unit
+    if amount_to_base(1.0, amount_unit)[1] != conc_unit:
+        raise ValueError(f"{du} does not match a mixture in {conc_unit}")
+
+
+def dose_from_rate(rate_ml_h: float, weight_kg: float | None, drug: dict):
+    """Convert pump rate (ml/h) to dose in the drug's configured dose_unit."""
+    du = drug["dose_unit"]
+    if du == "INFO/BOLUS":
+        return None
+
+    amount_unit, per_kg, time_unit = split_dose_unit(du)
+    conc, conc_unit = conc_per_ml(drug)  # µg/ml OR IE/ml OR mmol/ml
+    if conc == 0:
+        return None
+    _check_dimension(amount_unit, conc_unit, du)
+
+    # base amount per hour -> dose amount per hour
+    per_h = conc * rate_ml_h
+    if amount_unit == "g":
+        per_h = per_h / 1_000_000.0
+    elif amount_unit in ("mg", "mol"):
+        per_h = per_h / 1_000.0
+    elif amount_unit in ("ng", "µmol", "μmol", "umol"):
+        per_h = per_h * 1_000.0
+    # µg, mmol, IE: already in base units
+
+    # per hour -> per time unit
+    if time_unit == "h":
+        per_t = per_h
+    elif time_unit == "min":
+        per_t = per_h / 60.0
+    elif time_unit == "s":
+        per_t = per_h / 3600.0
+    else:
+        raise ValueError(f"Unsupported dose_unit: {du}")
+
+    if not per_kg:
+        return per_t
+    return None if not weight_kg else per_t / weight_kg
+
+
+def rate_from_dose(target: float, weight_kg: float | None, drug: dict):
+    """Convert target dose (in drug's dose_unit) to pump rate (ml/h)."""
+    du = drug["dose_unit"]
+    if du == "INFO/BOLUS":
+        return None
+
+    amount_unit, per_kg, time_unit = split_dose_unit(du)
+    conc, conc_unit = conc_per_ml(drug)
+    if target is None or conc == 0:
+        return None
+    _check_dimension(amount_unit, conc_unit, du)
+
+    if per_kg:
+        if not weight_kg:
+            return None
+        per_t = target * weight_kg
+    else:
+        per_t = target
+
+    # per time unit -> per hour
+    if time_unit == "h":
+        per_h = per_t
+    elif time_unit == "min":
+        per_h = per_t * 60.0
+    elif time_unit == "s":
+        per_h = per_t * 3600.0
+    else:
+        raise ValueError(f"Unsupported dose_unit: {du}")
+
+    # dose amount per hour -> base amount per hour
+    if amount_unit == "g":
+        per_h = per_h * 1_000_000.0
+    elif amount_unit in ("mg", "mol"):
+        per_h = per_h * 1_000.0
+    elif amount_unit in ("ng", "µmol", "μmol", "umol"):
+        per_h = per_h / 1_000.0
+
+    return per_h / conc
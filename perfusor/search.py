@@ -0,0 +1,154 @@
+"""
+Medikamentensuche: vorab gebauter Index über Handelsname, Wirkstoff (Text in
+Klammern), Konzentration und Dosiseinheit.
+
+    from perfusor.search import index_for
+    index_for(catalog).search("noradr 10")      # -> Namen, bestes Ergebnis zuerst
+
+Pro Suchwort zählen exakte Treffer vor Präfixtreffern; ohne Präfixtreffer wird
+tippfehlertolerant über Trigramme gesucht ("propfol" → Propofol). Alle Wörter
+müssen passen. Der Index wird einmal pro Katalogversion gebaut (LRU-Cache).
+"""
+
+import re
+import unicodedata
+from functools import lru_cache
+
+# Field weights: names rank above concentration, concentration above dose unit
+WEIGHT_NAME = 3.0
+WEIGHT_CONC = 1.5
+WEIGHT_UNIT = 1.0
+MIN_FUZZY_LEN = 3
+MIN_DICE = 0.5
+
+# unit expressions like "ug/kg/min" stay one token; "mg/50 ml" splits into mg, 50, ml
+_TOKEN = re.compile(r"[a-z]+(?:/[a-z]+)*|\d+(?:[.,]\d+)*")
+_PARENS = re.compile(r"\(([^)]*)\)")
+
+
+def normalize(text: str) -> str:
+    """Casefold and strip accents; µ becomes u, so "µg" and "ug" match."""
+    text = text.casefold().replace("µ", "u").replace("μ", "u")
+    return "".join(c for c in unicodedata.normalize("NFKD", text) if not unicodedata.combining(c))
+
+
+def tokens(text: str) -> list[str]:
+    return [t.replace(",", ".") for t in _TOKEN.findall(normalize(text))]
+
+
+def generic_name(name: str) -> str | None:
+    """Text in parentheses, e.g. "Noradrenalin" for "Arterenol (Noradrenalin) 10 mg/50 ml"."""
+    m = _PARENS.search(name)
+    return m.group(1).strip() if m else None
+
+
+def _trigrams(token: str) -> set[str]:
+    padded = f"${token}$"
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+class SearchIndex:
+    """Inverted index over one catalog: token -> {entry: field weight}, plus prefix and trigram maps."""
+
+    def __init__(self, specs, version: str | None = None):
+        self.version = version
+        self.names = tuple(specs)
+        vocab: dict[str, int] = {}
+        weights: list[dict[int, float]] = []
+        for entry, (name, spec) in enumerate(specs.items()):
+            fields = [(name, WEIGHT_NAME), (spec.dose_unit, WEIGHT_UNIT)]
+            if spec.conc is not None:
+                fields.append((f"{spec.conc:g} {spec.conc_unit}", WEIGHT_CONC))
+            for text, weight in fields:
+                for tok in tokens(text):
+                    # only the number of a concentration ranks above units
+                    w = weight if weight != WEIGHT_CONC or tok[0].isdigit() else WEIGHT_UNIT
+                    tid = vocab.setdefault(tok, len(vocab))
+                    if tid == len(weights):
+                        weights.append({})
+                    if weights[tid].get(entry, 0.0) < w:
+                        weights[tid][entry] = w
+        # postings[tid]: (weight, frozenset of entries) groups, so merging runs in C set operations
+        postings = []
+        for per_entry in weights:
+            groups: dict[float, list[int]] = {}
+            for entry, w in per_entry.items():
+                groups.setdefault(w, []).append(entry)
+            postings.append(tuple((w, frozenset(entries)) for w, entries in groups.items()))
+        self.vocab = tuple(vocab)
+        self.postings = postings
+        self.prefixes: dict[str, list[int]] = {}
+        self.grams: dict[str, list[int]] = {}
+        for tok, tid in vocab.items():
+            for i in range(1, len(tok) + 1):
+                self.prefixes.setdefault(tok[:i], []).append(tid)
+            for g in _trigrams(tok):
+                self.grams.setdefault(g, []).append(tid)
+        self._gram_counts = [len(_trigrams(tok)) for tok in self.vocab]
+        self.search = lru_cache(maxsize=256)(self._search)
+
+    def __len__(self):
+        return len(self.names)
+
+    def _matches(self, q: str) -> dict[int, float]:
+        """Token id -> match quality (1 exact, <1 prefix, <=0.5 fuzzy) for one query word."""
+        hits = {tid: 1.0 if len(self.vocab[tid]) == len(q) else 0.6 + 0.4 * len(q) / len(self.vocab[tid])
+                for tid in self.prefixes.get(q, ())}
+        if hits or len(q) < MIN_FUZZY_LEN:
+            return hits
+        grams = _trigrams(q)
+        shared: dict[int, int] = {}
+        for g in grams:
+            for tid in self.grams.get(g, ()):
+                shared[tid] = shared.get(tid, 0) + 1
+        for tid, n in shared.items():
+            dice = 2.0 * n / (len(grams) + self._gram_counts[tid])
+            if dice >= MIN_DICE:
+                hits[tid] = 0.5 * dice
+        return hits
+
+    def _cost(self, matches: dict[int, float]) -> int:
+        return sum(len(entries) for tid in matches for _, entries in self.postings[tid])
+
+    def _word_groups(self, matches: dict[int, float]) -> list[tuple[float, frozenset]]:
+        """Disjoint (score, entries) groups for one query word, each entry with its best score."""
+        groups = sorted(((quality * w, entries) for tid, quality in matches.items()
+                         for w, entries in self.postings[tid]), key=lambda g: -g[0])
+        seen = frozenset()
+        result = []
+        for s, entries in groups:  # best score first; later groups only keep unseen entries
+            new = entries - seen
+            if new:
+                result.append((s, new))
+                seen |= new
+        return result
+
+    def _search(self, query: str, limit: int | None = None) -> tuple[str, ...]:
+        words = tokens(query)
+        if not words:
+            return self.names[:limit]
+        # most selective word first, so the intersections shrink early
+        groups = None
+        for matches in sorted((self._matches(q) for q in words), key=self._cost):
+            word = self._word_groups(matches)
+            if groups is None:
+                groups = word
+            else:
+                groups = [(s1 + s2, inter) for s1, e1 in groups for s2, e2 in word if (inter := e1 & e2)]
+            if not groups:
+                return ()
+        by_score: dict[float, list] = {}
+        for s, entries in groups:
+            by_score.setdefault(s, []).extend(entries)
+        ranked = []
+        for s in sorted(by_score, reverse=True):
+            ranked += sorted(by_score[s])  # ties in catalog order
+            if limit is not None and len(ranked) >= limit:
+                break
+        return tuple(self.names[e] for e in ranked[:limit])
+
+
+@lru_cache(maxsize=8)
+def index_for(catalog) -> SearchIndex:
+    """Search index of a Catalog, built once per catalog version."""
+    return SearchIndex(catalog.specs, catalog.version)
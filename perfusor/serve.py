@@ -0,0 +1,121 @@
+"""
+Mehrere Worker-Prozesse der HTTP-API hinter einem Port.
+
+    python -m perfusor.serve --workers 4 --port 8502
+
+Der Master lädt die Kataloge, legt die Batch-Tabelle jedes Katalogs (SpecTable:
+k und per_kg je Eintrag) in einem gemeinsamen Verzeichnis ab (PERFUSOR_SHARED_DIR,
+memory-mapped, siehe perfusor.shared) und startet die Worker. Den Katalog selbst
+lädt jeder Worker (aus dem Binär-Cache). Jeder Worker bindet denselben Port mit
+SO_REUSEPORT (der Kernel verteilt die Verbindungen); ohne SO_REUSEPORT erben
+geforkte Worker den Socket des Masters. Abgestürzte Worker werden neu gestartet.
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import shutil
+import signal
+import socket
+import sys
+import tempfile
+import time
+
+REUSE_PORT = hasattr(socket, "SO_REUSEPORT")
+
+
+def listen_socket(host: str, port: int, reuse_port: bool) -> socket.socket:
+    sock = socket.socket(socket.AF_INET6 if ":" in host else socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    if reuse_port:
+        sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEPORT, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    sock.setblocking(False)
+    return sock
+
+
+def warm_up():
+    """Build the shared batch tables once in the master so workers only map them."""
+    from .catalog import stores
+
+    for store in stores().values():
+        store.get().table
+
+
+def _worker(host: str, port: int, sock: socket.socket | None):
+    from .api import serve_stdlib
+
+    signal.signal(signal.SIGINT, signal.SIG_IGN)  # the master handles Ctrl-C and stops us with SIGTERM
+    if sock is None:
+        sock = listen_socket(host, port, reuse_port=True)
+    try:
+        asyncio.run(serve_stdlib(sock=sock))
+    except KeyboardInterrupt:
+        pass
+
+
+def serve(host: str = "127.0.0.1", port: int = 8502, workers: int | None = None, shared_dir: str | None = None):
+    """Run `workers` API processes on one port until interrupted."""
+    workers = workers or os.cpu_count() or 1
+    own_dir = shared_dir is None
+    shared_dir = shared_dir or tempfile.mkdtemp(prefix="perfusor-shared-")
+    os.environ["PERFUSOR_SHARED_DIR"] = shared_dir
+    warm_up()
+
+    if REUSE_PORT:
+        ctx = multiprocessing.get_context()
+        # bind once in the master to fail early on a busy port (and to resolve port 0), then close it
+        # before forking: the kernel would hand connections to a socket nobody accepts on
+        sock, worker_sock = listen_socket(host, port, reuse_port=True), None
+    else:
+        ctx = multiprocessing.get_context("fork")  # workers inherit the master's listening socket
+        sock = worker_sock = listen_socket(host, port, reuse_port=False)
+    bound_port = sock.getsockname()[1]
+    if REUSE_PORT:
+        sock.close()
+
+    def start():
+        p = ctx.Process(target=_worker, args=(host, bound_port, worker_sock), daemon=True)
+        p.start()
+        return p
+
+    def stop(*_):
+        raise KeyboardInterrupt
+
+    signal.signal(signal.SIGTERM, stop)
+    procs = [start() for _ in range(workers)]
+    print(f"Serving on http://{host}:{bound_port} with {workers} workers (shared: {shared_dir})",
+          file=sys.stderr, flush=True)
+    try:
+        while True:
+            time.sleep(0.5)
+            for i, p in enumerate(procs):
+                if not p.is_alive():
+                    print(f"worker {p.pid} exited ({p.exitcode}), restarting", file=sys.stderr, flush=True)
+                    procs[i] = start()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for p in procs:
+            p.terminate()
+        for p in procs:
+            p.join(5)
+        if own_dir:
+            shutil.rmtree(shared_dir, ignore_errors=True)
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.serve", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8502)
+    ap.add_argument("--workers", type=int, help="default: number of CPUs")
+    ap.add_argument("--shared-dir", help="directory for shared arrays (default: temporary, removed on exit)")
+    args = ap.parse_args(argv)
+    serve(args.host, args.port, args.workers, args.shared_dir)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
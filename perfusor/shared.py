@@ -0,0 +1,63 @@
+"""
+Gemeinsamer Speicher für Worker-Prozesse: kompilierte Katalogtabellen und
+vorberechnete Perfusor-Tabellen als memory-mapped .npy-Dateien.
+
+Aktiv, wenn PERFUSOR_SHARED_DIR gesetzt ist (setzt `python -m perfusor.serve`
+automatisch). Der erste Prozess, der ein Array braucht, schreibt es atomar nach
+$PERFUSOR_SHARED_DIR/<Katalogversion>/…; alle weiteren mappen dieselbe Datei
+schreibgeschützt, die Seiten liegen also nur einmal im Page-Cache. Neue
+Katalogversionen (Hot-Reload) bekommen ein eigenes Verzeichnis.
+"""
+
+import os
+import shutil
+import tempfile
+import zlib
+from pathlib import Path
+
+import numpy as np
+
+from .batch import SpecTable
+
+
+def shared_dir() -> Path | None:
+    value = os.environ.get("PERFUSOR_SHARED_DIR")
+    return Path(value) if value else None
+
+
+def cached_arrays(key: str, build) -> dict[str, np.ndarray]:
+    """
+    Arrays stored under shared_dir()/key, memory-mapped read-only. `build()` returns a
+    dict of arrays and runs only in the first process that asks (or without a shared dir).
+    """
+    root = shared_dir()
+    if root is None:
+        return build()
+    target = root / key
+    if not target.is_dir():
+        arrays = build()
+        target.parent.mkdir(parents=True, exist_ok=True)
+        tmp = Path(tempfile.mkdtemp(prefix=".tmp-", dir=target.parent))
+        for name, array in arrays.items():
+            np.save(tmp / f"{name}.npy", np.ascontiguousarray(array), allow_pickle=False)
+        try:
+            os.rename(tmp, target)  # atomic; another worker may have won the race
+        except OSError:
+            shutil.rmtree(tmp, ignore_errors=True)
+    return {p.stem: np.load(p, mmap_mode="r", allow_pickle=False) for p in target.glob("*.npy")}
+
+
+def spec_table(catalog) -> SpecTable:
+    """SpecTable of `catalog` on shared read-only arrays."""
+    arrays = cached_arrays(f"{catalog.version}/spec-table", lambda: _spec_arrays(catalog))
+    return SpecTable.from_arrays(arrays["names"].tolist(), arrays["k"], arrays["per_kg"])
+
+
+def _spec_arrays(catalog) -> dict[str, np.ndarray]:
+    table = SpecTable(catalog.specs)
+    return {"names": np.array(table.names, dtype=str), "k": table.k, "per_kg": table.per_kg}
+
+
+def key_hash(*parts) -> str:
+    """Short stable hash for array keys derived from parameters (grids, columns)."""
+    return f"{zlib.crc32(repr(parts).encode('utf-8')):08x}"
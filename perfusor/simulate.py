@@ -0,0 +1,249 @@
+"""
+Infusionsverlauf über die Zeit: kumulative Dosis, Restvolumen der Spritze und
+Spritzenwechsel für Dosis-/Ratenschemata.
+
+    python -m perfusor.simulate "Minirin (Desmopressin) 20 µg/50 ml" --dose 4 --stop 5
+    python -m perfusor.simulate "Rapibloc (Landiolol) 300 mg/50 ml" --weight 70 --titrate 2.5 10
+    python -m perfusor.simulate "Hydrocortone (Hydrocortison) 100 mg/50 ml" --steps 0:8.4,24:4.2,48:2.1 --hours 72
+
+Ein Schema ist stückweise konstant (Dosis in der Einheit des Medikaments oder
+Rate in ml/h). Verlauf und Wechselzeitpunkte werden exakt pro Abschnitt
+berechnet (kumulatives Volumen ist stückweise linear); `sample()` liefert daraus
+per np.interp Zeitreihen in beliebiger Auflösung, z. B. 1 s über 72 h.
+Spritzenwechsel: leere Spritze wird sofort durch eine volle ersetzt.
+"""
+
+import argparse
+import csv
+import sys
+
+import numpy as np
+
+from .catalog import current
+from .core import DrugSpec, fmt
+
+
+class Schedule:
+    """Piecewise-constant regime: values[i] applies from times_s[i] on (kind "dose" or "rate" in ml/h)."""
+    __slots__ = ("times_s", "values", "kind")
+
+    def __init__(self, times_s, values, kind: str = "dose"):
+        if kind not in ("dose", "rate"):
+            raise ValueError(f"kind must be 'dose' or 'rate', not {kind!r}")
+        times_s = np.asarray(times_s, dtype=float)
+        values = np.asarray(values, dtype=float)
+        if times_s.ndim != 1 or times_s.shape != values.shape or not len(times_s):
+            raise ValueError("times_s and values must be 1-D and of equal, non-zero length")
+        if times_s[0] != 0 or np.any(np.diff(times_s) <= 0):
+            raise ValueError("times_s must start at 0 and increase strictly")
+        if np.any(values < 0) or not np.all(np.isfinite(values)):
+            raise ValueError("values must be finite and >= 0")
+        self.times_s = times_s
+        self.values = values
+        self.kind = kind
+
+    def __repr__(self):
+        return f"Schedule({self.kind}, {len(self.values)} steps)"
+
+    @classmethod
+    def constant(cls, value: float, kind: str = "dose", stop_h: float | None = None) -> "Schedule":
+        """One value from t=0, optionally stopped (0) after `stop_h` hours, e.g. 4 µg/h over 5 h."""
+        return cls.steps([(0.0, value)], kind, stop_h)
+
+    @classmethod
+    def steps(cls, steps, kind: str = "dose", stop_h: float | None = None) -> "Schedule":
+        """Step scheme from (hours, value) pairs, e.g. [(0, 8.4), (24, 4.2), (48, 2.1)]."""
+        steps = sorted(steps)
+        if stop_h is not None:
+            steps = [s for s in steps if s[0] < stop_h] + [(stop_h, 0.0)]
+        return cls([h * 3600.0 for h, _ in steps], [v for _, v in steps], kind)
+
+    @classmethod
+    def titration(cls, start: float, step: float, every_min: float, limit: float | None = None,
+                  increases: int | None = None, kind: str = "dose") -> "Schedule":
+        """Start value, raised by `step` every `every_min` minutes up to `limit` (or `increases` times), then held."""
+        if step <= 0 or every_min <= 0:
+            raise ValueError("step and every_min must be > 0")
+        if increases is None:
+            if limit is None:
+                raise ValueError("titration needs limit or increases")
+            increases = max(int(np.ceil(round((limit - start) / step, 9))), 0)
+        values = start + step * np.arange(increases + 1)
+        if limit is not None:
+            values = np.minimum(values, limit)
+        return cls(np.arange(len(values)) * every_min * 60.0, values, kind)
+
+
+class Simulation:
+    """
+    Exact piecewise result on breakpoints `t_s` (segment i runs from t_s[i] to t_s[i+1]):
+    rate/dose per segment, cumulative ml and amount at each breakpoint, syringe change times.
+    """
+    __slots__ = ("spec", "weight_kg", "t_s", "rate_ml_h", "dose", "cum_ml", "initial_ml", "syringe_ml",
+                 "runout_s")
+
+    def __init__(self, spec, weight_kg, t_s, rate_ml_h, dose, cum_ml, initial_ml, syringe_ml, runout_s):
+        self.spec = spec
+        self.weight_kg = weight_kg
+        self.t_s = t_s
+        self.rate_ml_h = rate_ml_h
+        self.dose = dose
+        self.cum_ml = cum_ml
+        self.initial_ml = initial_ml
+        self.syringe_ml = syringe_ml
+        self.runout_s = runout_s
+
+    @property
+    def duration_s(self) -> float:
+        return float(self.t_s[-1])
+
+    @property
+    def amount_unit(self) -> str:
+        """Unit of cumulative amounts: the drug's amount_unit (mg, µg, IE, ...)."""
+        return self.spec.amount_unit
+
+    @property
+    def amount_per_ml(self) -> float:
+        return self.spec.amount / self.spec.volume_ml
+
+    @property
+    def total_ml(self) -> float:
+        return float(self.cum_ml[-1])
+
+    @property
+    def total_amount(self) -> float:
+        return self.total_ml * self.amount_per_ml
+
+    @property
+    def syringes(self) -> int:
+        """Syringes used, including the one running at the start."""
+        return 1 + len(self.runout_s)
+
+    def sample(self, dt_s: float = 1.0) -> dict:
+        """Time series at `dt_s` resolution: t_s, rate_ml_h, dose, cum_ml, cum_amount, remaining_ml."""
+        t = np.arange(0.0, self.duration_s + dt_s / 2, dt_s)
+        # the grid is sorted, so per-segment values are runs: repeat them instead of a lookup per sample
+        seg_counts = self._runs(t, self.t_s[1:-1])
+        cum_ml = np.interp(t, self.t_s, self.cum_ml)
+        syringe_start = self.initial_ml + self.syringe_ml * np.arange(len(self.runout_s) + 1)
+        return {
+            "t_s": t,
+            "rate_ml_h": np.repeat(self.rate_ml_h, seg_counts),
+            "dose": np.repeat(self.dose, seg_counts),
+            "cum_ml": cum_ml,
+            "cum_amount": cum_ml * self.amount_per_ml,
+            "remaining_ml": np.repeat(syringe_start, self._runs(t, self.runout_s)) - cum_ml,
+        }
+
+    @staticmethod
+    def _runs(t, bounds):
+        """Number of samples of `t` in each interval split at `bounds` (a sample at a bound belongs to the right)."""
+        return np.diff(np.searchsorted(t, bounds, side="left"), prepend=0, append=len(t))
+
+
+def simulate(drug: DrugSpec | str, schedule: Schedule, weight_kg: float | None = None, hours: float = 24.0,
+             initial_ml: float | None = None, syringe_ml: float | None = None, catalog=None) -> Simulation:
+    """
+    Run `schedule` for `hours`. `initial_ml` is the volume left in the running syringe
+    (default: full), `syringe_ml` the volume of each new one (default: volume_ml).
+    """
+    spec = drug if isinstance(drug, DrugSpec) else (catalog or current()).specs[drug]
+    if spec.k is None:
+        raise ValueError(f"{spec.name}: no rate/dose conversion (INFO/BOLUS)")
+    if spec.per_kg and not weight_kg:
+        raise ValueError(f"{spec.name}: {spec.dose_unit} needs weight_kg")
+    syringe_ml = float(syringe_ml or spec.volume_ml)
+    initial_ml = syringe_ml if initial_ml is None else float(initial_ml)
+    if syringe_ml <= 0 or initial_ml < 0:
+        raise ValueError("syringe volumes must be > 0")
+
+    end = hours * 3600.0
+    keep = schedule.times_s < end
+    t_s = np.append(schedule.times_s[keep], end)
+    values = schedule.values[keep]
+    scale = weight_kg if spec.per_kg else 1.0
+    if schedule.kind == "dose":
+        dose, rate_ml_h = values, values * scale / spec.k
+    else:
+        dose, rate_ml_h = spec.k * values / scale, values
+    cum_ml = np.concatenate(([0.0], np.cumsum(rate_ml_h * np.diff(t_s) / 3600.0)))
+
+    # syringe changes where cumulative volume reaches initial, initial + syringe, ... while still running
+    levels = initial_ml + syringe_ml * np.arange(int((cum_ml[-1] - initial_ml) // syringe_ml) + 1)
+    levels = levels[levels < cum_ml[-1]]
+    seg = np.maximum(np.searchsorted(cum_ml, levels, side="left") - 1, 0)  # segment in which a level is hit
+    with np.errstate(divide="ignore", invalid="ignore"):
+        runout_s = np.where(levels > 0, t_s[seg] + (levels - cum_ml[seg]) * 3600.0 / rate_ml_h[seg], 0.0)
+    return Simulation(spec, weight_kg, t_s, rate_ml_h, dose, cum_ml, initial_ml, syringe_ml, runout_s)
+
+
+def simulate_ward(pumps, weight_kg: float | None = None, hours: float = 24.0, catalog=None) -> list[Simulation]:
+    """Simulate many pumps, given as (drug, schedule) or (drug, schedule, initial_ml) tuples."""
+    return [simulate(drug, schedule, weight_kg, hours, *rest, catalog=catalog) for drug, schedule, *rest in pumps]
+
+
+# ---- CLI ----
+def _hhmm(seconds: float) -> str:
+    minutes = int(round(seconds / 60.0))
+    return f"{minutes // 60:d}:{minutes % 60:02d} h"
+
+
+def _parse_steps(text: str) -> list[tuple[float, float]]:
+    try:
+        return [(float(h), float(v)) for h, v in (part.split(":") for part in text.split(","))]
+    except ValueError:
+        raise argparse.ArgumentTypeError("steps must look like 0:8.4,24:4.2") from None
+
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.simulate", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("drug", help="catalog name")
+    ap.add_argument("--weight", type=float, help="kg (needed for weight-based dose units)")
+    ap.add_argument("--hours", type=float, default=24.0)
+    ap.add_argument("--rate", action="store_true", help="values are rates in ml/h instead of doses")
+    regime = ap.add_mutually_exclusive_group()
+    regime.add_argument("--dose", type=float, help="constant value (default: start dose of the sheet)")
+    regime.add_argument("--steps", type=_parse_steps, help="step scheme HOURS:VALUE,... e.g. 0:8.4,24:4.2")
+    regime.add_argument("--titrate", nargs=2, type=float, metavar=("STEP", "EVERY_MIN"),
+                        help="raise from the start dose by STEP every EVERY_MIN minutes up to --max")
+    ap.add_argument("--max", type=float, help="titration ceiling (default: max of the sheet)")
+    ap.add_argument("--stop", type=float, metavar="HOURS", help="stop a constant infusion after HOURS")
+    ap.add_argument("--initial-ml", type=float, help="volume left in the running syringe")
+    ap.add_argument("--csv", help="write the sampled time series to this file")
+    ap.add_argument("--dt", type=float, default=60.0, help="sample interval for --csv in seconds (default 60)")
+    args = ap.parse_args(argv)
+
+    spec = current().specs.get(args.drug)
+    if spec is None:
+        ap.error(f"unknown drug: {args.drug}")
+    kind = "rate" if args.rate else "dose"
+    try:
+        if args.steps:
+            schedule = Schedule.steps(args.steps, kind, args.stop)
+        elif args.titrate:
+            step, every = args.titrate
+            schedule = Schedule.titration(spec.start or 0.0, step, every, args.max or spec.max, kind=kind)
+        else:
+            value = args.dose if args.dose is not None else spec.start
+            if value is None:
+                ap.error("no start dose in the sheet, pass --dose")
+            schedule = Schedule.constant(value, kind, args.stop)
+        sim = simulate(spec, schedule, args.weight, args.hours, args.initial_ml)
+    except ValueError as exc:
+        ap.error(str(exc))
+
+    print(f"{spec.name}: {args.hours:g} h, {len(sim.rate_ml_h)} Abschnitte")
+    print(f"  Gesamt: {fmt(sim.total_ml)} ml = {fmt(sim.total_amount)} {sim.amount_unit}, {sim.syringes} Spritze(n)")
+    for n, t in enumerate(sim.runout_s, 1):
+        print(f"  Spritze {n} leer / Wechsel nach {_hhmm(t)}")
+    if args.csv:
+        series = sim.sample(args.dt)
+        with open(args.csv, "w", newline="", encoding="utf-8") as f:
+            writer = csv.writer(f)
+            writer.writerow(series)
+            writer.writerows(zip(*(np.round(v, 6).tolist() for v in series.values())))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,401 @@
+"""
+Statischer Rechner für das Notion-Embed: eine HTML-Datei mit eingebettetem
+Katalog und JavaScript-Rechenkern, ohne Server-Roundtrip pro Eingabe.
+
+    python -m perfusor.static_build perfusor.html
+    python -m perfusor.static_build perfusor.html --catalog stationen/its.toml
+    python -m perfusor.static_build --check 200000      # JS gegen Python prüfen (node)
+
+Der Katalog wird in Python kompiliert (k, per_kg, Konzentration, Beschriftungen);
+im Browser bleibt nur die Arithmetik von dose_from_rate/rate_from_dose
+(k·Rate/Gewicht, Dosis·Gewicht/k) und für Custom-Mischungen die von conc_per_ml
+mit den Faktoren aus perfusor.units – dieselben Operationen in derselben
+Reihenfolge auf IEEE-Doubles, also bitgleiche Ergebnisse. `--check` rechnet
+zufällige Eingaben mit node und vergleicht Zahlen bitgenau und die Anzeige
+(fmt) zeichengenau mit den Python-Funktionen; Exit-Code 1 bei Abweichungen.
+"""
+
+import argparse
+import html
+import json
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+
+from .catalog import current, load_catalog
+from .core import compile_drug, dose_from_rate, fmt, rate_from_dose
+from .search import normalize
+from .units import (AMOUNT_UNITS, CUSTOM_AMOUNT_UNITS, CUSTOM_DOSE_UNITS, amount_scale, compatible,
+                    dose_unit_factor, parse_dose_unit)
+
+CUSTOM_NOTE = "Custom-Mischung (keine Speicherung von Daten)."
+
+
+def bundle_data(catalog) -> dict:
+    """Everything the page needs, precompiled: specs with labels, Custom unit tables."""
+    drugs = []
+    for name, spec in catalog.specs.items():
+        drugs.append({
+            "name": name, "dose_unit": spec.dose_unit, "k": spec.k, "per_kg": spec.per_kg,
+            "conc": spec.conc, "conc_unit": spec.conc_unit, "note": spec.note,
+            # default target of the dose field; labels as app.spec_labels prints them
+            "start": spec.start,
+            "start_label": None if spec.start is None else str(spec.start),
+            "max_label": None if spec.max is None else str(spec.max),
+            "search": normalize(f"{name} {spec.dose_unit}"),
+        })
+    amount_units = {}
+    for unit in CUSTOM_AMOUNT_UNITS:
+        num, den, base = amount_scale(unit)
+        amount_units[unit] = [num, den, base, AMOUNT_UNITS[unit][0]]
+    dose_units = {}
+    for du in CUSTOM_DOSE_UNITS:
+        factor, per_kg = dose_unit_factor(du)
+        dose_units[du] = [factor, per_kg, parse_dose_unit(du).dimension]
+    return {"catalog": catalog.name, "version": catalog.version, "drugs": drugs,
+            "amount_units": amount_units, "dose_units": dose_units, "custom_note": CUSTOM_NOTE}
+
+
+def _script_json(data) -> str:
+    # "<" escaped so "</script>" in a drug note cannot end the script element
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")).replace("<", "\\u003c")
+
+
+def build(catalog) -> str:
+    """Self-contained HTML page for `catalog`."""
+    return (_HTML.replace("__TITLE__", html.escape(f"Perfusor-Rechner – {catalog.name}"))
+                 .replace("__VERSION__", html.escape(catalog.version))
+                 .replace("__CORE__", JS_CORE)
+                 .replace("__DATA__", _script_json(bundle_data(catalog))))
+
+
+# ---- Parity check (JS core under node vs. perfusor.core) ----
+def _number(rng: random.Random, hi: float) -> float:
+    """Input-like numbers: arbitrary floats, UI steps, integers, exact .xx5 ties for fmt."""
+    kind = rng.random()
+    if kind < 0.4:
+        return rng.uniform(0, hi)
+    if kind < 0.7:
+        return round(rng.uniform(0, hi), 2)
+    if kind < 0.85:
+        return float(rng.randint(0, int(hi)))
+    return rng.randint(0, int(hi) * 8) / 8
+
+
+def random_cases(catalog, n: int, seed: int = 0) -> list[dict]:
+    rng = random.Random(seed)
+    names = list(catalog.specs)
+    cases = []
+    for _ in range(n):
+        case = {
+            "rate": _number(rng, 100), "target": _number(rng, 50),
+            "weight": rng.choice([None, 0.0, _number(rng, 250), _number(rng, 250), _number(rng, 250)]),
+        }
+        if rng.random() < 0.3:
+            unit = rng.choice(CUSTOM_AMOUNT_UNITS)
+            case["custom"] = [_number(rng, 5000), unit, rng.choice([0.0, 1.0]) or _number(rng, 100),
+                              rng.choice([du for du in CUSTOM_DOSE_UNITS if compatible(unit, du)])]
+        else:
+            case["drug"] = rng.randrange(len(names))
+        cases.append(case)
+    return cases
+
+
+def expected(catalog, case: dict) -> dict:
+    """Python reference result for one case (same fields as the JS runner)."""
+    if "custom" in case:
+        amount, unit, volume, du = case["custom"]
+        spec = compile_drug({"amount": amount, "amount_unit": unit, "volume_ml": volume, "dose_unit": du,
+                             "start": None, "max": None, "note": CUSTOM_NOTE}, "Custom")
+    else:
+        spec = list(catalog.specs.values())[case["drug"]]
+    dose = dose_from_rate(case["rate"], case["weight"], spec)
+    rate = rate_from_dose(case["target"], case["weight"], spec)
+    return {
+        "k": spec.k, "conc": spec.conc, "dose": dose, "rate": rate,
+        "text": [fmt(spec.conc), spec.conc_unit, fmt(dose), fmt(rate), fmt(case["rate"] / 60.0),
+                 fmt(None if rate is None else rate / 60.0), fmt(case["target"])],
+    }
+
+
+def check(catalog, n: int, seed: int = 0, node: str = "node") -> list[tuple[dict, dict, dict]]:
+    """Run `n` random cases through the JS core; returns the mismatches (case, python, js)."""
+    cases = random_cases(catalog, n, seed)
+    with tempfile.TemporaryDirectory(prefix="perfusor-static-") as tmp:
+        runner = Path(tmp) / "runner.js"
+        runner.write_text(JS_CORE + _JS_RUNNER, encoding="utf-8")
+        proc = subprocess.run(
+            [node, str(runner)], input=json.dumps({"data": bundle_data(catalog), "cases": cases}),
+            capture_output=True, text=True, check=True,
+        )
+    got = json.loads(proc.stdout)
+    mismatches = []
+    for case, js in zip(cases, got, strict=True):
+        py = expected(catalog, case)
+        if py != js:  # floats compare exactly: both sides serialize the shortest round-trip repr
+            mismatches.append((case, py, js))
+    return mismatches
+
+
+# ---- CLI ----
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.static_build", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("output", nargs="?", help="HTML file to write")
+    ap.add_argument("--catalog", help="catalog file (default: current catalog, see PERFUSOR_CATALOG)")
+    ap.add_argument("--check", type=int, metavar="N", help="compare the JS core with Python on N random inputs")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--node", default="node", help="node executable for --check")
+    args = ap.parse_args(argv)
+    if not args.output and not args.check:
+        ap.error("nothing to do: give an output file and/or --check N")
+
+    catalog = load_catalog(args.catalog) if args.catalog else current()
+    if args.output:
+        page = build(catalog)
+        Path(args.output).write_text(page, encoding="utf-8")
+        print(f"{len(catalog.specs)} entries, version {catalog.version}: {args.output} ({len(page) / 1024:.0f} KiB)")
+    if args.check:
+        if shutil.which(args.node) is None:
+            ap.error(f"--check needs node ({args.node} not found)")
+        mismatches = check(catalog, args.check, args.seed, args.node)
+        for case, py, js in mismatches[:10]:
+            print(f"MISMATCH {json.dumps(case, ensure_ascii=False)}\n  python {py}\n  js     {js}")
+        print(f"{'FAIL' if mismatches else 'ok  '} {args.check} cases, {len(mismatches)} mismatches")
+        return 1 if mismatches else 0
+    return 0
+
+
+# ---- JavaScript ----
+# Pure functions only; the page and the node runner both call perfusorCore(data).
+JS_CORE = r"""
+function perfusorCore(data) {
+  "use strict";
+  // perfusor.core.dose_from_rate / rate_from_dose: same operations, same order
+  function doseFromRate(rate, weight, spec) {
+    if (spec.k === null) return null;
+    if (spec.per_kg) return !weight ? null : spec.k * rate / weight;
+    return spec.k * rate;
+  }
+  function rateFromDose(target, weight, spec) {
+    if (target === null || spec.k === null) return null;
+    if (spec.per_kg) return !weight ? null : target * weight / spec.k;
+    return target / spec.k;
+  }
+  function compatible(amountUnit, doseUnit) {
+    const a = data.amount_units[amountUnit], d = data.dose_units[doseUnit];
+    return Boolean(a && d) && a[3] === d[2];
+  }
+  // compile_drug for a Custom mixture: conc_per_ml, then k = conc · factor
+  function customSpec(amount, amountUnit, volume, doseUnit) {
+    const [num, den, base] = data.amount_units[amountUnit];
+    const [factor, perKg] = data.dose_units[doseUnit];
+    const conc = volume === 0 ? 0 : amount * num / den / volume;
+    return {
+      name: "Custom", dose_unit: doseUnit, conc: conc, conc_unit: volume === 0 ? "—" : base + "/ml",
+      k: conc === 0 ? null : conc * factor, per_kg: perKg, note: data.custom_note,
+      start: null, start_label: null, max_label: null,
+    };
+  }
+  // f"{x:.2f}": toFixed rounds exact ties (x = n/8) up, Python to even
+  function fmt(x) {
+    if (x === null || x === undefined) return "—";
+    if (Number.isNaN(x)) return "nan";
+    if (!Number.isFinite(x)) return x > 0 ? "inf" : "-inf";
+    const sign = x < 0 || Object.is(x, -0) ? "-" : "";
+    const a = Math.abs(x);
+    if (a >= 1e21) return sign + BigInt(a).toString() + ".00";
+    let s = a.toFixed(2);
+    const eighths = a * 8;
+    if (Number.isInteger(eighths) && eighths % 2 === 1 && Number(s[s.length - 1]) % 2 === 1) {
+      s = s.slice(0, -1) + (Number(s[s.length - 1]) - 1);
+    }
+    return sign + s;
+  }
+  function normalize(text) {
+    return text.toLowerCase().replace(/[µμ]/g, "u").normalize("NFKD").replace(/[\u0300-\u036f]/g, "");
+  }
+  function search(query) {
+    const words = normalize(query).split(/\s+/).filter(Boolean);
+    return data.drugs.filter(d => words.every(w => d.search.includes(w)));
+  }
+  return {doseFromRate, rateFromDose, compatible, customSpec, fmt, search};
+}
+"""
+
+_JS_RUNNER = r"""
+let input = "";
+process.stdin.on("data", chunk => { input += chunk; });
+process.stdin.on("end", () => {
+  const {data, cases} = JSON.parse(input);
+  const core = perfusorCore(data);
+  const out = cases.map(c => {
+    const spec = c.custom ? core.customSpec(...c.custom) : data.drugs[c.drug];
+    const dose = core.doseFromRate(c.rate, c.weight, spec);
+    const rate = core.rateFromDose(c.target, c.weight, spec);
+    return {
+      k: spec.k, conc: spec.conc, dose: dose, rate: rate,
+      text: [core.fmt(spec.conc), spec.conc_unit, core.fmt(dose), core.fmt(rate), core.fmt(c.rate / 60.0),
+             core.fmt(rate === null ? null : rate / 60.0), core.fmt(c.target)],
+    };
+  });
+  process.stdout.write(JSON.stringify(out));
+});
+"""
+
+_HTML = r"""<!DOCTYPE html>
+<html lang="de"><head><meta charset="utf-8">
+<meta name="viewport" content="width=device-width, initial-scale=1">
+<title>__TITLE__</title>
+<style>
+body { font-family: sans-serif; max-width: 46rem; margin: 1rem auto; padding: 0 1rem; color: #222; }
+label { display: block; margin: .6rem 0 .2rem; font-size: .9rem; }
+input, select { font-size: 1rem; padding: .3rem; width: 100%; box-sizing: border-box; }
+.row { display: flex; gap: 1rem; }
+.row > * { flex: 1; }
+.caption { color: #666; font-size: .85rem; }
+.note { background: #e8f1fb; padding: .5rem .7rem; border-radius: .3rem; }
+.warn { background: #fdf3d8; padding: .5rem .7rem; border-radius: .3rem; }
+.metric { font-size: 2rem; margin: .3rem 0; }
+hr { border: 0; border-top: 1px solid #ddd; margin: 1rem 0; }
+[hidden] { display: none !important; }
+</style></head><body>
+<h1>Perfusor-Rechner</h1>
+<p class="caption">Interne Rechenhilfe. Therapie/Verordnung immer nach Hausstandard &amp; klinischer Situation.</p>
+
+<h3>Patient</h3>
+<label for="weight">Gewicht (kg)</label>
+<input id="weight" type="number" min="0" step="0.5" value="70.0">
+<hr>
+
+<label for="query">Suche (Name, Wirkstoff, Konzentration, Einheit)</label>
+<input id="query" type="search" placeholder="z. B. noradr, propofol, µg/kg/min">
+<p id="no-hits" class="caption" hidden>Keine Treffer – alle Medikamente angezeigt.</p>
+<label for="drug">Medikament auswählen</label>
+<select id="drug"></select>
+
+<div id="custom" hidden>
+  <h3>Custom-Perfusor</h3>
+  <p>Für Mischungen, die nicht in der Standardliste sind.</p>
+  <div class="row">
+    <div><label for="amount">Menge</label><input id="amount" type="number" min="0" step="0.1" value="10.00"></div>
+    <div><label for="amount-unit">Einheit Menge</label><select id="amount-unit"></select></div>
+    <div><label for="volume">Volumen (ml)</label><input id="volume" type="number" min="1" step="1" value="50"></div>
+  </div>
+  <label for="dose-unit">Ziel-/Ausgabe-Einheit</label>
+  <select id="dose-unit"></select>
+</div>
+
+<h3 id="title"></h3>
+<p id="conc" class="caption"></p>
+<p id="note" class="note" hidden></p>
+<p id="start" hidden></p>
+<p id="max" hidden></p>
+<hr>
+
+<p id="info" class="warn" hidden>Für dieses Medikament ist im Standardblatt keine eindeutige kontinuierliche Perfusor-Umrechnung (Rate ↔ Dosis) definiert. Bitte nutze ggf. 'Custom' oder halte dich an das Protokoll im Kommentar.</p>
+<div id="calc" class="row">
+  <div>
+    <h3>Rate → Dosis</h3>
+    <label for="rate">Rate (ml/h)</label>
+    <input id="rate" type="number" min="0" step="0.1" value="2.00">
+    <div class="caption" id="dose-label"></div>
+    <div class="metric" id="dose"></div>
+    <div>= <b id="rate-min"></b> ml/min</div>
+  </div>
+  <div>
+    <h3>Dosis → Rate</h3>
+    <label for="target" id="target-label"></label>
+    <input id="target" type="number" min="0" step="0.1" value="0.00">
+    <div class="caption">Benötigte Rate (ml/h)</div>
+    <div class="metric" id="out-rate"></div>
+    <div id="out-rate-min-row">= <b id="out-rate-min"></b> ml/min</div>
+  </div>
+</div>
+<hr>
+<p class="caption">Hinweis: Keine Speicherung von Daten. Dieser Rechner dient nur der Umrechnung (Rate ↔ Dosis).
+Katalogversion __VERSION__.</p>
+
+<script>
+__CORE__
+const DATA = __DATA__;
+const core = perfusorCore(DATA);
+const $ = id => document.getElementById(id);
+const num = id => { const v = $(id).valueAsNumber; return Number.isNaN(v) ? 0 : v; };
+const show = (id, text) => { $(id).hidden = !text; $(id).textContent = text || ""; };
+
+function fillOptions(select, values, keep) {
+  const previous = select.value;
+  select.replaceChildren(...values.map(v => new Option(v, v)));
+  if (keep && values.includes(previous)) select.value = previous;
+}
+
+function currentSpec() {
+  const choice = $("drug").value;
+  if (choice !== "Custom") return DATA.drugs.find(d => d.name === choice);
+  return core.customSpec(num("amount"), $("amount-unit").value, num("volume"), $("dose-unit").value);
+}
+
+function updateDrugList() {
+  const query = $("query").value.trim();
+  const hits = query ? core.search(query) : DATA.drugs;
+  $("no-hits").hidden = !(query && hits.length === 0);
+  fillOptions($("drug"), (hits.length ? hits : DATA.drugs).map(d => d.name).concat("Custom"), false);
+  selectDrug();
+}
+
+function updateDoseUnits() {
+  const unit = $("amount-unit").value;
+  fillOptions($("dose-unit"), Object.keys(DATA.dose_units).filter(du => core.compatible(unit, du)), true);
+}
+
+function selectDrug() {
+  const spec = currentSpec();
+  $("target").value = core.fmt(spec.start === null ? 0 : spec.start);
+  render();
+}
+
+function render() {
+  const custom = $("drug").value === "Custom";
+  $("custom").hidden = !custom;
+  const spec = currentSpec();
+  const weight = num("weight");
+  show("title", custom ? "" : spec.name);
+  $("conc").textContent = "Konzentration: " + core.fmt(spec.conc) + " " + spec.conc_unit;
+  show("note", spec.note);
+  show("start", spec.start_label && "Start (laut Blatt): " + spec.start_label + " " + spec.dose_unit);
+  show("max", spec.max_label && "Max (laut Blatt): " + spec.max_label + " " + spec.dose_unit);
+
+  const info = spec.dose_unit === "INFO/BOLUS";
+  $("info").hidden = !info;
+  $("calc").hidden = info;
+  if (info) return;
+  const rate = num("rate");
+  $("dose-label").textContent = "Dosis (" + spec.dose_unit + ")";
+  $("dose").textContent = core.fmt(core.doseFromRate(rate, weight, spec));
+  $("rate-min").textContent = core.fmt(rate / 60.0);
+  $("target-label").textContent = "Zieldosis (" + spec.dose_unit + ")";
+  const outRate = core.rateFromDose(num("target"), weight, spec);
+  $("out-rate").textContent = core.fmt(outRate);
+  $("out-rate-min-row").hidden = outRate === null;
+  $("out-rate-min").textContent = core.fmt(outRate === null ? null : outRate / 60.0);
+}
+
+fillOptions($("amount-unit"), Object.keys(DATA.amount_units), false);
+updateDoseUnits();
+$("query").addEventListener("input", updateDrugList);
+$("drug").addEventListener("change", selectDrug);
+$("amount-unit").addEventListener("change", () => { updateDoseUnits(); render(); });
+for (const id of ["weight", "rate", "target", "amount", "volume", "dose-unit"]) {
+  $(id).addEventListener("input", render);
+}
+updateDrugList();
+</script>
+</body></html>
+"""
+
+
+if __name__ == "__main__":
+    sys.exit(main())
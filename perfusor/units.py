@@ -0,0 +1,120 @@
+# =============================================================================
+# Einheiten: Mengen- und Dosiseinheiten als Dimension × Skalierung (ohne Drittpakete)
+# =============================================================================
+#
+# Mengen:  Masse (g, mg, µg, ng; Basis µg), Stoffmenge (mol, mmol, µmol; Basis mmol),
+#          Internationale Einheiten (IE; Basis IE)
+# Dosis:   <Menge>[/kg]/<Zeit> mit Zeit h, min, s – z. B. "µg/kg/min", "mmol/kg/h", "mg/min"
+#
+# Einheiten werden einmal geparst und gecacht; Skalierungen sind ganzzahlige Brüche,
+# damit jeder Faktor genau einmal gerundet wird (num / den).
+
+from functools import lru_cache
+
+# canonical unit -> (dimension, num, den): amount in base unit = amount · num / den
+AMOUNT_UNITS = {
+    "g": ("mass", 1_000_000, 1),
+    "mg": ("mass", 1_000, 1),
+    "µg": ("mass", 1, 1),
+    "ng": ("mass", 1, 1_000),
+    "mol": ("substance", 1_000, 1),
+    "mmol": ("substance", 1, 1),
+    "µmol": ("substance", 1, 1_000),
+    "IE": ("IU", 1, 1),
+}
+BASE_UNITS = {"mass": "µg", "substance": "mmol", "IU": "IE"}
+ALIASES = {"ug": "µg", "mcg": "µg", "μg": "µg", "umol": "µmol", "μmol": "µmol", "IU": "IE", "I.E.": "IE"}
+# time unit -> how many of them make one hour
+PER_HOUR = {"h": 1, "min": 60, "s": 3600}
+WEIGHT_UNITS = ("kg",)
+# offered for Custom mixtures (app.py, perfusor.static_build); with INFO/BOLUS: perfusor.drugs.SUPPORTED_DOSE_UNITS
+CUSTOM_AMOUNT_UNITS = ("g", "mg", "µg", "ng", "mmol", "IE")
+CUSTOM_DOSE_UNITS = (
+    "µg/kg/min", "µg/kg/h", "mg/kg/min", "mg/kg/h", "ng/kg/min", "mg/h", "mg/min", "µg/h", "µg/min", "g/h",
+    "mmol/h", "mmol/kg/h", "IE/h", "IE/kg/h",
+)
+
+
+class UnitError(ValueError):
+    """Unknown unit or dimensionally invalid unit combination."""
+
+
+class DoseUnit:
+    """Parsed dose unit: amount unit, per body weight?, time unit."""
+    __slots__ = ("text", "amount_unit", "dimension", "per_kg", "time_unit")
+
+    def __init__(self, text, amount_unit, dimension, per_kg, time_unit):
+        self.text = text
+        self.amount_unit = amount_unit
+        self.dimension = dimension
+        self.per_kg = per_kg
+        self.time_unit = time_unit
+
+    def __repr__(self):
+        return f"DoseUnit({self.text!r})"
+
+
+def canonical_amount_unit(unit: str) -> str:
+    unit = ALIASES.get(unit, unit)
+    if unit not in AMOUNT_UNITS:
+        raise UnitError(f"Unsupported amount_unit: {unit}")
+    return unit
+
+
+@lru_cache(maxsize=None)
+def amount_scale(unit: str) -> tuple[int, int, str]:
+    """(num, den, base unit) so that amount in base unit = amount · num / den."""
+    dimension, num, den = AMOUNT_UNITS[canonical_amount_unit(unit)]
+    return num, den, BASE_UNITS[dimension]
+
+
+@lru_cache(maxsize=None)
+def parse_dose_unit(text: str) -> DoseUnit:
+    """Parse "<amount>[/kg]/<time>"; raises UnitError for anything else."""
+    parts = [p.strip() for p in text.split("/")]
+    if len(parts) == 3 and parts[1] in WEIGHT_UNITS:
+        amount, per_kg, time_unit = parts[0], True, parts[2]
+    elif len(parts) == 2:
+        amount, per_kg, time_unit = parts[0], False, parts[1]
+    else:
+        raise UnitError(f"Unsupported dose_unit: {text} (expected amount[/kg]/time)")
+    if time_unit not in PER_HOUR:
+        raise UnitError(f"Unsupported dose_unit: {text} (time must be one of {', '.join(PER_HOUR)})")
+    try:
+        amount = canonical_amount_unit(amount)
+    except UnitError:
+        raise UnitError(f"Unsupported dose_unit: {text} (unknown amount {amount!r})") from None
+    return DoseUnit(text, amount, AMOUNT_UNITS[amount][0], per_kg, time_unit)
+
+
+@lru_cache(maxsize=None)
+def dose_unit_factor(dose_unit: str) -> tuple[float, bool]:
+    """
+    (factor, per_kg) from base amount per hour (µg/h, mmol/h, IE/h) to `dose_unit`,
+    e.g. "µg/kg/min" -> (1/60, True).
+    """
+    du = parse_dose_unit(dose_unit)
+    _, num, den = AMOUNT_UNITS[du.amount_unit]
+    # base/h -> amount/h: · den/num;  per hour -> per time unit: / PER_HOUR
+    return den / (num * PER_HOUR[du.time_unit]), du.per_kg
+
+
+@lru_cache(maxsize=None)
+def conversion(amount_unit: str, dose_unit: str) -> tuple[float, bool]:
+    """
+    (factor, per_kg) for a drug mixed in `amount_unit` and dosed in `dose_unit`;
+    raises UnitError if the dimensions differ (e.g. mg mixed, IE/h dosed).
+    """
+    du = parse_dose_unit(dose_unit)
+    dimension = AMOUNT_UNITS[canonical_amount_unit(amount_unit)][0]
+    if dimension != du.dimension:
+        raise UnitError(f"{amount_unit} ({dimension}) cannot be dosed in {dose_unit} ({du.dimension})")
+    return dose_unit_factor(dose_unit)
+
+
+def compatible(amount_unit: str, dose_unit: str) -> bool:
+    try:
+        conversion(amount_unit, dose_unit)
+    except UnitError:
+        return False
+    return True
@@ -0,0 +1,261 @@
+"""
+Differentielle Prüfung der Rate ↔ Dosis-Umrechnung mit Zufallsfällen.
+
+    python -m perfusor.verify                               # 1 Mio. Fälle, alle Kerne
+    python -m perfusor.verify --cases 5000000 --workers 8 --seed 7
+    python -m perfusor.verify --fault "ng/kg/min"           # Gegenprobe: Fehler muss auffallen
+
+Erzeugt blockweise zufällige Fälle (Medikament aus dem Katalog oder Custom-Mischung
+mit zufälliger Menge/Einheit/Volumen in allen Einheiten von perfusor.units, Gewicht,
+Rate, Zieldosis) und prüft je Fall:
+
+- Rechenkern (perfusor.core) gegen die je Einheit ausgeschriebene Referenz
+  (perfusor.reference), relativ genau auf --rtol,
+- Batch-Engine (perfusor.batch) gegen den Rechenkern, bitgenau (NaN ↔ None),
+- Hin- und Rückweg rate_from_dose(dose_from_rate(r)) ≈ r und umgekehrt,
+- None genau dann, wenn INFO-Eintrag, Konzentration 0 oder gewichtsbezogen ohne Gewicht.
+
+Die Blöcke laufen parallel über alle Kerne; Seeds hängen nur von --seed und der
+Blocknummer ab, das Ergebnis also nicht von --workers. Katalogeinträge, die die
+Referenz nicht rechnen kann, werden übersprungen und gemeldet. Exit-Code 1 bei
+Abweichungen.
+"""
+
+import argparse
+import math
+import multiprocessing
+import os
+import sys
+import time
+
+import numpy as np
+
+from . import reference
+from .batch import SpecTable, dose_from_rate_batch, rate_from_dose_batch
+from .catalog import current, load_catalog
+from .core import DrugSpec, compile_drug, dose_from_rate, rate_from_dose
+from .units import ALIASES, AMOUNT_UNITS, PER_HOUR, compatible
+
+CUSTOM_PER_BATCH = 64
+MAX_FAILURES = 10  # kept per batch and in the report
+CHECKS = ("none", "reference", "batch", "roundtrip")
+# share of special cases
+P_CUSTOM = 0.3
+P_NO_WEIGHT = 0.05
+P_EMPTY = 0.02      # custom mixture with amount or volume 0
+P_INFO = 0.02       # custom INFO/BOLUS entry
+# every unit perfusor.units accepts (aliases included), not only the app's Custom lists
+AMOUNT_CHOICES = (*AMOUNT_UNITS, *ALIASES)
+DOSE_CHOICES = tuple(f"{a}{kg}/{t}" for a in AMOUNT_CHOICES for kg in ("", "/kg") for t in PER_HOUR)
+
+
+# ---- Case generation ----
+def _log_uniform(rng, lo, hi, size=None):
+    return 10.0 ** rng.uniform(math.log10(lo), math.log10(hi), size)
+
+
+def random_custom(rng) -> dict:
+    """A random Custom mixture: amount unit, a dimensionally compatible dose unit, amount and volume."""
+    if rng.random() < P_INFO:
+        return {"amount": 0, "amount_unit": "mg", "volume_ml": 1, "dose_unit": "INFO/BOLUS"}
+    amount_unit = str(rng.choice(AMOUNT_CHOICES))
+    dose_units = [du for du in DOSE_CHOICES if compatible(amount_unit, du)]
+    amount = float(_log_uniform(rng, 1e-3, 1e4))
+    volume = float(rng.choice((1, 2, 5, 10, 20, 50, 100))) if rng.random() < 0.7 else float(rng.uniform(0.5, 500))
+    if rng.random() < P_EMPTY:
+        amount, volume = (0.0, volume) if rng.random() < 0.5 else (amount, 0.0)
+    return {"amount": amount, "amount_unit": amount_unit, "volume_ml": volume,
+            "dose_unit": str(rng.choice(dose_units))}
+
+
+def _faulty(spec: DrugSpec, fault: str | None) -> DrugSpec:
+    # Injected error for the self-check: k off by 1 ppm for one dose unit
+    if fault is None or spec.dose_unit != fault or spec.k is None:
+        return spec
+    fields = {attr: getattr(spec, attr) for attr in DrugSpec.__slots__}
+    return DrugSpec(**{**fields, "k": spec.k * (1 + 1e-6)})
+
+
+def unsupported(catalog) -> dict:
+    """{name: reason} for catalog entries the reference cannot convert (skipped, not failed)."""
+    skipped = {}
+    for name, drug in catalog.drugs.items():
+        try:
+            reference.dose_from_rate(1.0, 70.0, drug)
+        except (ValueError, TypeError, AttributeError) as exc:
+            skipped[name] = str(exc)
+    return skipped
+
+
+def expect_none(drug: dict, weight_kg) -> bool:
+    """Independent oracle: when must a conversion yield None?"""
+    du = drug["dose_unit"]
+    if du == "INFO/BOLUS" or not drug.get("amount") or not drug.get("volume_ml"):
+        return True
+    return "/kg/" in du and not weight_kg
+
+
+# ---- Checks ----
+def _close(got, want, rtol) -> bool:
+    return abs(got - want) <= rtol * abs(want)
+
+
+def _same(got, batch_value) -> bool:
+    # scalar None <-> batch NaN, otherwise bit-identical
+    return math.isnan(batch_value) if got is None else got == batch_value
+
+
+def _check_case(fail, name, spec, drug, w, rate, target, dose, back, ref_dose, ref_back, rtol):
+    """None/reference/round-trip checks of one case against the reference results."""
+    if expect_none(drug, w):
+        if dose is not None or back is not None or ref_dose is not None or ref_back is not None:
+            fail("none", name, w, rate, (dose, back), (ref_dose, ref_back))
+    elif dose is None or back is None or ref_dose is None or ref_back is None:
+        fail("none", name, w, rate, (dose, back), (ref_dose, ref_back))
+    else:
+        if not (_close(dose, ref_dose, rtol) and _close(back, ref_back, rtol)):
+            fail("reference", name, w, (rate, target), (dose, back), (ref_dose, ref_back))
+        if not _close(rate_from_dose(dose, w, spec), rate, rtol):
+            fail("roundtrip", name, w, rate, rate_from_dose(dose, w, spec), rate)
+        if not _close(dose_from_rate(back, w, spec), target, rtol):
+            fail("roundtrip", name, w, target, dose_from_rate(back, w, spec), target)
+
+
+def run_batch(catalog, seed_seq, size: int, rtol: float, fault: str | None = None) -> dict:
+    """Generate and check `size` cases; returns per-check counts and the first failures."""
+    rng = np.random.default_rng(seed_seq)
+    skipped = unsupported(catalog)
+    names = [name for name in catalog.names if name not in skipped]
+    drugs = {name: dict(catalog.drugs[name]) for name in names}
+    for i in range(CUSTOM_PER_BATCH):
+        drugs[f"Custom #{i}"] = random_custom(rng)
+    specs = {name: _faulty(catalog.specs[name] if name in catalog.specs else compile_drug(drug, name), fault)
+             for name, drug in drugs.items()}
+    table = SpecTable(specs)
+    keys = np.array(list(specs), dtype=object)
+
+    n_catalog = len(names)
+    custom = rng.random(size) < P_CUSTOM if n_catalog else np.ones(size, dtype=bool)
+    rows = np.where(custom, n_catalog + rng.integers(0, CUSTOM_PER_BATCH, size),
+                    rng.integers(0, max(n_catalog, 1), size))
+    weights = _log_uniform(rng, 0.5, 250.0, size)
+    no_weight = rng.random(size) < P_NO_WEIGHT
+    weights[no_weight] = 0.0
+    as_none = no_weight & (rng.random(size) < 0.5)  # scalar path sees None instead of 0.0
+    rates = _log_uniform(rng, 1e-2, 1e3, size)
+    targets = _log_uniform(rng, 1e-4, 1e4, size)
+
+    drug_keys = keys[rows]
+    doses_b = dose_from_rate_batch(rates, weights, drug_keys, table)
+    rates_b = rate_from_dose_batch(targets, weights, drug_keys, table)
+
+    counts = dict.fromkeys(CHECKS, 0)
+    failures = []
+
+    def fail(check, name, weight, value, got, want):
+        counts[check] += 1
+        if len(failures) < MAX_FAILURES:
+            failures.append({"check": check, "drug": name, "dict": drugs[name], "weight_kg": weight,
+                             "value": value, "got": got, "expected": want})
+
+    spec_list = list(specs.values())
+    drug_list = list(drugs.values())
+    name_list = list(specs)
+    for row, weight, none_w, rate, target, dose_b, rate_b in zip(
+            rows.tolist(), weights.tolist(), as_none.tolist(), rates.tolist(), targets.tolist(),
+            doses_b.tolist(), rates_b.tolist()):
+        spec, drug = spec_list[row], drug_list[row]
+        w = None if none_w else weight
+        dose = dose_from_rate(rate, w, spec)
+        back = rate_from_dose(target, w, spec)
+        try:
+            ref_dose = reference.dose_from_rate(rate, w, drug)
+            ref_back = reference.rate_from_dose(target, w, drug)
+        except (ValueError, TypeError) as exc:  # a Custom unit the core accepts but the reference does not
+            fail("reference", name_list[row], w, (rate, target), (dose, back), str(exc))
+        else:
+            _check_case(fail, name_list[row], spec, drug, w, rate, target, dose, back, ref_dose, ref_back, rtol)
+        if not (_same(dose, dose_b) and _same(back, rate_b)):
+            fail("batch", name_list[row], w, (rate, target), (dose_b, rate_b), (dose, back))
+    return {"cases": size, "counts": counts, "failures": failures}
+
+
+# ---- Parallel driver ----
+_CATALOG = None
+
+
+def _init_worker(catalog):
+    global _CATALOG
+    _CATALOG = catalog
+
+
+def _run(args):
+    seed_seq, size, rtol, fault = args
+    return run_batch(_CATALOG, seed_seq, size, rtol, fault)
+
+
+def verify(cases: int, catalog=None, workers: int | None = None, batch: int = 50_000, seed: int = 0,
+           rtol: float = 1e-12, fault: str | None = None, progress=None) -> dict:
+    """Run `cases` random cases in batches over `workers` processes; returns merged counts and failures."""
+    catalog = catalog or current()
+    workers = workers or os.cpu_count() or 1
+    sizes = [batch] * (cases // batch) + ([cases % batch] if cases % batch else [])
+    jobs = [(ss, size, rtol, fault) for ss, size in zip(np.random.SeedSequence(seed).spawn(len(sizes)), sizes)]
+    total = {"cases": 0, "counts": dict.fromkeys(CHECKS, 0), "failures": [], "skipped": unsupported(catalog)}
+    t0 = time.perf_counter()
+
+    def merge(result):
+        total["cases"] += result["cases"]
+        for check, n in result["counts"].items():
+            total["counts"][check] += n
+        total["failures"].extend(result["failures"][:MAX_FAILURES - len(total["failures"])])
+        if progress:
+            progress(total["cases"], time.perf_counter() - t0)
+
+    if workers == 1:
+        _init_worker(catalog)
+        for job in jobs:
+            merge(_run(job))
+    else:
+        with multiprocessing.Pool(workers, _init_worker, (catalog,)) as pool:
+            for result in pool.imap_unordered(_run, jobs):
+                merge(result)
+    total["seconds"] = time.perf_counter() - t0
+    total["workers"] = workers
+    return total
+
+
+# ---- CLI ----
+def main(argv=None):
+    ap = argparse.ArgumentParser(prog="python -m perfusor.verify", description=__doc__.strip().splitlines()[0])
+    ap.add_argument("--cases", type=int, default=1_000_000)
+    ap.add_argument("--workers", type=int, help="processes (default: all cores)")
+    ap.add_argument("--batch", type=int, default=50_000, help="cases per batch")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--rtol", type=float, default=1e-12, help="relative tolerance vs. reference and round trip")
+    ap.add_argument("--fault", metavar="DOSE_UNIT", help="inject a 1 ppm error for this dose unit (self-check)")
+    ap.add_argument("--catalog", help="JSON/TOML drug catalog (default: $PERFUSOR_CATALOG or built-in)")
+    ap.add_argument("-q", "--quiet", action="store_true", help="no progress output on stderr")
+    args = ap.parse_args(argv)
+
+    def progress(n, elapsed):
+        print(f"\r{n:,} cases, {n / elapsed if elapsed else 0:,.0f} cases/s", end="", file=sys.stderr)
+
+    result = verify(args.cases, load_catalog(args.catalog) if args.catalog else current(), args.workers,
+                    args.batch, args.seed, args.rtol, args.fault, progress=None if args.quiet else progress)
+    if not args.quiet:
+        print(file=sys.stderr)
+    failed = sum(result["counts"].values())
+    for name, reason in result["skipped"].items():
+        print(f"SKIP {name}: {reason}")
+    for failure in result["failures"]:
+        print(f"FAIL {failure}")
+    print(f"{result['cases']:,} cases in {result['seconds']:.2f} s on {result['workers']} workers "
+          f"({result['cases'] / result['seconds'] if result['seconds'] else 0:,.0f} cases/s); "
+          + ", ".join(f"{check}: {n:,} failed" for check, n in result["counts"].items())
+          + (f"; {len(result['skipped'])} catalog entries skipped" if result["skipped"] else ""))
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
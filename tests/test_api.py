@@ -0,0 +1,29 @@
+import json
+
+from perfusor import api
+
+DRUG = "Arterenol (Noradrenalin) 10 mg/50 ml"
+
+
+def _post(path, body):
+    status, data = api.handle("POST", path, json.dumps(body).encode("utf-8"))
+    return status, json.loads(data)
+
+
+def test_batch_overflowing_int_is_400():
+    status, body = _post("/batch", {"op": "dose", "drug": DRUG, "value": [10 ** 400], "weight_kg": 70})
+    assert status == 400 and "error" in body
+
+
+def test_handler_bug_is_500(monkeypatch):
+    def broken(body):
+        raise RuntimeError("boom")
+
+    monkeypatch.setitem(api.ROUTES, ("POST", "/dose"), broken)
+    status, body = _post("/dose", {})
+    assert status == 500 and body == {"error": "Internal error"}
+
+
+def test_non_finite_results_are_null():
+    status, body = _post("/batch", {"op": "dose", "drug": DRUG, "value": [1, 1e308], "weight_kg": 70})
+    assert status == 200 and body["result"][1] is None
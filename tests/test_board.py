@@ -0,0 +1,21 @@
+from perfusor.board import Board
+
+DRUG = "Arterenol (Noradrenalin) 10 mg/50 ml"
+
+
+def test_cleared_volume_is_full_syringe():
+    board = Board(70)
+    board.add(DRUG, 3.0, 12.0)
+    full = board.pumps[0].drug.volume_ml
+
+    board.update([(DRUG, 3.0, None)])
+    assert board.pumps[0].volume_ml == full
+    assert board.rows[0].volume_ml == full
+
+
+def test_unchanged_rows_are_not_recomputed():
+    board = Board(70)
+    board.add(DRUG, 3.0)
+    before = board.recomputed
+    board.update([(DRUG, 3.0, None)])
+    assert board.recomputed == before
@@ -0,0 +1,38 @@
+import json
+import os
+
+import pytest
+
+from perfusor.catalog import CatalogError, load_catalog
+
+ENTRY = {"amount": 10, "amount_unit": "mg", "volume_ml": 50, "dose_unit": "µg/kg/min", "start": 0.05, "max": 0.5}
+
+
+def _write(tmp_path, **fields):
+    path = tmp_path / "station.json"
+    path.write_text(json.dumps({"drugs": {"A 10 mg/50 ml": ENTRY | fields}}), encoding="utf-8")
+    return path
+
+
+@pytest.mark.parametrize("fields", [{"amount": "20"}, {"max": "0.75"}, {"amount": True}, {"volume_ml": "50"},
+                                    {"start": False}])
+def test_non_numeric_values_rejected(tmp_path, fields):
+    with pytest.raises(CatalogError) as exc:
+        load_catalog(_write(tmp_path, **fields), cache_dir=tmp_path / "cache")
+    assert "must be a number" in str(exc.value)
+
+
+def test_numeric_values_load(tmp_path):
+    catalog = load_catalog(_write(tmp_path), cache_dir=tmp_path / "cache")
+    spec = catalog.specs["A 10 mg/50 ml"]
+    assert spec.max == 0.5 and spec.k is not None
+
+
+@pytest.mark.skipif(not hasattr(os, "getuid"), reason="POSIX permissions")
+def test_shared_cache_dir_ignored(tmp_path):
+    cache_dir = tmp_path / "cache"
+    cache_dir.mkdir(mode=0o777)
+    cache_dir.chmod(0o777)
+    path = _write(tmp_path)
+    load_catalog(path, cache_dir=cache_dir)
+    assert not list(cache_dir.iterdir())  # nothing written to (or read from) a world-writable directory
@@ -0,0 +1,26 @@
+import io
+import json
+
+from perfusor.convert import JsonlSink, convert, read_rows
+
+DRUG = "Arterenol (Noradrenalin) 10 mg/50 ml"
+
+
+def test_bad_rows_are_flagged_not_fatal():
+    lines = [
+        json.dumps({"drug": DRUG, "rate_ml_h": 3, "weight_kg": 70}),
+        "{not json",
+        "[1]",
+        json.dumps({"drug": ["x"], "rate_ml_h": 3}),
+        json.dumps({"drug": "Gibt es nicht", "rate_ml_h": 3}),
+        "",
+        json.dumps({"drug": DRUG, "rate_ml_h": 6, "weight_kg": 70}),
+    ]
+    out = io.StringIO()
+    stats = convert(read_rows(io.StringIO("\n".join(lines) + "\n"), "jsonl"), JsonlSink(out), chunk_size=2)
+
+    assert stats["rows"] == 6
+    assert stats["invalid_rows"] == 3
+    assert stats["unknown_rows"] == 1
+    statuses = [json.loads(line)["status"] for line in out.getvalue().splitlines()]
+    assert statuses == ["ok", "invalid_row", "invalid_row", "invalid_row", "unknown_drug", "ok"]
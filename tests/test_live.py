@@ -0,0 +1,63 @@
+import asyncio
+import json
+import time
+
+import pytest
+
+from perfusor.live import BedHub, simulated_feed, tcp_feed
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not predicate():
+        if time.monotonic() > deadline:
+            return False
+        time.sleep(0.02)
+    return True
+
+
+@pytest.fixture
+def hub():
+    hub = BedHub(lambda bed: simulated_feed(bed, pumps=3, interval_s=0.002, seed=1), refresh_s=0.1, idle_s=0.5)
+    yield hub
+    hub.close()
+
+
+def test_viewers_share_one_coalesced_subscription(hub):
+    hub.subscribe("ITS-1", "a")
+    hub.subscribe("ITS-1", "b")
+    assert hub.connects == 1
+    assert _wait_for(lambda: hub.snapshot("ITS-1").received > 50)
+    snapshot = hub.subscribe("ITS-1", "a")
+    assert len(snapshot.pumps) == 3
+    assert snapshot.version < snapshot.received  # many samples per publication
+    assert snapshot.subscribers == 2
+
+
+def test_lease_expiry_closes_the_subscription(hub):
+    hub.subscribe("ITS-2", "a")
+    assert "ITS-2" in hub.beds
+    assert _wait_for(lambda: "ITS-2" not in hub.beds)
+    hub.subscribe("ITS-2", "a")
+    assert hub.connects == 2
+
+
+def test_tcp_feed_skips_invalid_lines(caplog):
+    good = {"pump_id": 1, "drug": "X", "rate_ml_h": 2.5, "t_s": 0}
+    lines = [b"{broken\n", b"[1]\n", json.dumps({"pump_id": 1}).encode() + b"\n", json.dumps(good).encode() + b"\n"]
+
+    async def run():
+        async def handle(reader, writer):
+            await reader.readline()
+            writer.writelines(lines)
+            await writer.drain()
+            writer.close()
+
+        server = await asyncio.start_server(handle, "127.0.0.1", 0)
+        async with server:
+            port = server.sockets[0].getsockname()[1]
+            return [s async for s in tcp_feed("ITS-1", "127.0.0.1", port)]
+
+    samples = asyncio.run(run())
+    assert [(s.pump_id, s.rate_ml_h) for s in samples] == [(1, 2.5)]
+    assert sum("skipping invalid gateway line" in r.message for r in caplog.records) == 3
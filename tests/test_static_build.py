@@ -0,0 +1,18 @@
+import shutil
+
+import pytest
+
+from perfusor.catalog import current
+from perfusor.static_build import build, check
+
+
+def test_js_core_matches_python():
+    node = shutil.which("node")
+    if node is None:
+        pytest.skip("node not installed")
+    assert check(current(), 3000, seed=1, node=node) == []
+
+
+def test_build_embeds_catalog_version():
+    catalog = current()
+    assert catalog.version in build(catalog)